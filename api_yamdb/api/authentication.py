@@ -0,0 +1,133 @@
+import uuid
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+)
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from reviews.models import User
+
+from api_yamdb.const import AUTH_USER_CACHE_TIMEOUT
+
+CACHED_USER_FIELDS = ('id', 'username', 'role', 'is_superuser', 'is_active')
+
+
+def get_user_version_key(user_id):
+    return f'auth-user-version:{user_id}'
+
+
+def get_user_cache_key(user_id, version):
+    """Ключ кеша с данными пользователя для аутентификации."""
+
+    return f'auth-user:{user_id}:{version}'
+
+
+def get_user_version(store, user_id):
+    """
+    Текущая версия записи пользователя. Версия — случайная строка, так
+    что новая версия не совпадёт ни с одной прежней.
+    """
+
+    key = get_user_version_key(user_id)
+    version = store.get(key)
+    if version is None:
+        store.add(key, uuid.uuid4().hex, None)
+        version = store.get(key)
+    return version
+
+
+def get_user_store():
+    """
+    Хранилище кеша аутентификации из настройки AUTH_USER_CACHE_STORE.
+    Оно должно быть общим для всех процессов: сброс записи в кеше одного
+    процесса не отзовёт роль или доступ в остальных.
+    """
+
+    return import_string(settings.AUTH_USER_CACHE_STORE)()
+
+
+class CachedUser(TokenUser):
+    """
+    Лёгкий пользователь для проверки прав: только поля, которые нужны
+    permissions, без обращения к таблице пользователей.
+    """
+
+    def __init__(self, token, data):
+        super().__init__(token)
+        self.__dict__.update(data)
+
+    @property
+    def is_admin(self):
+        return self.role == 'admin'
+
+    @property
+    def is_moderator(self):
+        return self.role == 'moderator'
+
+    def get_instance(self):
+        """Загрузить полноценный объект пользователя из БД."""
+
+        return User.objects.get(pk=self.pk)
+
+
+class CachedUserJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация, которая берёт пользователя из общего для всех
+    процессов кеша. Ключ записи включает версию пользователя, которая
+    меняется при его сохранении или удалении, так что смена роли или
+    блокировка учитываются со следующего запроса в любом процессе.
+    Версия читается до загрузки строки из БД: если строку изменили
+    после чтения, устаревшие данные попадут под прежнюю версию, которую
+    уже никто не прочитает.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification')
+            )
+        store = get_user_store()
+        key = get_user_cache_key(user_id, get_user_version(store, user_id))
+        data = store.get(key)
+        if data is None:
+            data = (
+                User.objects.filter(
+                    **{api_settings.USER_ID_FIELD: user_id}
+                )
+                .values(*CACHED_USER_FIELDS)
+                .first()
+            )
+            if data is None:
+                raise AuthenticationFailed(
+                    _('User not found'), code='user_not_found'
+                )
+            store.set(key, data, AUTH_USER_CACHE_TIMEOUT)
+        if not data['is_active']:
+            raise AuthenticationFailed(
+                _('User is inactive'), code='user_inactive'
+            )
+        return CachedUser(validated_token, data)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """
+    Сменить версию пользователя после фиксации транзакции: до неё
+    другие запросы ещё читают прежнюю строку.
+    """
+
+    key = get_user_version_key(instance.pk)
+    transaction.on_commit(
+        lambda: get_user_store().set(key, uuid.uuid4().hex, None)
+    )
@@ -0,0 +1,347 @@
+import gc
+import json
+import math
+import threading
+import time
+import tracemalloc
+
+from django.db import connection, reset_queries
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from reviews.models import Category, Genre, Review, Title, User
+
+from api_yamdb.const import (
+    BENCHMARK_LATENCY_FLOOR_MS,
+    BENCHMARK_LATENCY_THRESHOLD,
+    BENCHMARK_MEMORY_THRESHOLD,
+    BENCHMARK_QUERIES_THRESHOLD,
+)
+
+from .caching import bump_version
+
+METRICS = ('p50_ms', 'p99_ms', 'queries', 'memory_kb')
+STAMPEDE_METRICS = ('queries', 'recomputed', 'stale', 'p50_ms', 'p99_ms')
+
+
+def percentile(values, fraction):
+    """Перцентиль по методу ближайшего ранга."""
+
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def remote_addr(number):
+    """Свой IP-адрес для каждого запроса, чтобы не упираться в троттлинг."""
+
+    return f'10.{number // 65536 % 256}.{number // 256 % 256}.{number % 256}'
+
+
+class Benchmark:
+    """
+    Замер маршрутов api/urls.py тестовым клиентом Django в том же
+    процессе. Для каждого сценария: число запросов к БД и пик выделенной
+    памяти (по одному прогону с CaptureQueriesContext и tracemalloc,
+    чтобы они не искажали время), затем p50/p99 времени ответа по
+    iterations прогонам. Данные должны быть уже в БД: сценарии берут
+    самые популярные произведение, отзыв и жанр. Кеш ответов на время
+    замера отключается: иначе после прогрева замерялись бы только
+    попадания в кеш, без запросов к БД. Не замеряются PATCH и DELETE
+    (каждый прогон менял бы или удалял данные следующих), а также
+    /metrics, который не обращается к БД.
+    """
+
+    def __init__(self, iterations=100, warmup=3):
+        self.iterations = iterations
+        self.warmup = warmup
+        self.client = Client()
+        self.calls = 0
+
+    def prepare(self):
+        """Выбрать объекты для сценариев и создать служебные записи."""
+
+        self.title = Title.objects.annotate(
+            count=Count('reviews')
+        ).order_by('-count', 'pk').first()
+        self.review = Review.objects.filter(title=self.title).annotate(
+            count=Count('comments')
+        ).order_by('-count', 'pk').first()
+        self.comment = self.review.comments.order_by('pk').first()
+        self.genre = Genre.objects.order_by('pk').first()
+        self.category = Category.objects.order_by('pk').first()
+        needed = self.iterations + self.warmup + 2
+        self.users = list(
+            User.objects.filter(role='user').order_by('pk')[:needed]
+        )
+        if len(self.users) < needed:
+            raise ValueError(
+                f'Для замера нужно не меньше {needed} пользователей.'
+            )
+        self.admin, _ = User.objects.get_or_create(
+            username='benchmark-admin',
+            defaults={'email': 'benchmark-admin@yamdb.fake', 'role': 'admin'},
+        )
+        # Произведение и отзыв без отзывов и комментариев, чтобы каждый
+        # прогон создавал их от нового автора.
+        self.empty_title = Title.objects.create(
+            name='Замер', year=2000, category=self.category
+        )
+        self.empty_review = Review.objects.create(
+            title=self.empty_title, author=self.admin, text='Замер', score=5
+        )
+
+    def auth(self, user):
+        return {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'}
+
+    def user(self, number):
+        return self.users[number % len(self.users)]
+
+    def stream(self, url, **extra):
+        """GET с чтением потокового ответа: запросы к БД идут при чтении."""
+
+        response = self.client.get(url, **extra)
+        response.getvalue()
+        return response
+
+    def scenarios(self):
+        """Сценарии: имя -> функция (номер вызова) -> ответ."""
+
+        titles = '/api/v1/titles/'
+        title = f'{titles}{self.title.pk}/'
+        reviews = f'{title}reviews/'
+        review = f'{reviews}{self.review.pk}/'
+        comments = f'{review}comments/'
+        get = self.client.get
+        post = self.client.post
+        admin = self.auth(self.admin)
+        return {
+            'titles-list': lambda n: get(titles),
+            'titles-list-limit-100': lambda n: get(f'{titles}?limit=100'),
+            'titles-list-cursor': lambda n: get(f'{titles}?cursor='),
+            'titles-filter': lambda n: get(
+                f'{titles}?genre={self.genre.slug}&year_min=1950'
+                f'&category={self.category.slug}'
+            ),
+            'titles-search': lambda n: get(f'{titles}?q=мост'),
+            'title-detail': lambda n: get(title),
+            'title-create': lambda n: post(
+                titles,
+                {'name': 'Замер', 'year': 2000,
+                 'category': self.category.slug, 'genre': [self.genre.slug]},
+                **admin,
+            ),
+            'categories-list': lambda n: get('/api/v1/categories/'),
+            'category-create': lambda n: post(
+                '/api/v1/categories/',
+                {'name': 'Замер', 'slug': f'bench-{n}'}, **admin,
+            ),
+            'genres-list': lambda n: get('/api/v1/genres/'),
+            'genre-create': lambda n: post(
+                '/api/v1/genres/',
+                {'name': 'Замер', 'slug': f'bench-{n}'}, **admin,
+            ),
+            'reviews-list': lambda n: get(reviews),
+            'review-detail': lambda n: get(review),
+            'review-create': lambda n: post(
+                f'{titles}{self.empty_title.pk}/reviews/',
+                {'text': 'Замер', 'score': 7}, **self.auth(self.user(n)),
+            ),
+            'comments-list': lambda n: get(comments),
+            'comment-detail': lambda n: get(
+                f'{comments}{self.comment.pk}/'
+            ),
+            'comment-create': lambda n: post(
+                f'{titles}{self.empty_title.pk}/reviews/'
+                f'{self.empty_review.pk}/comments/',
+                {'text': 'Замер'}, **self.auth(self.user(n)),
+            ),
+            'users-list': lambda n: get('/api/v1/users/', **admin),
+            'user-detail': lambda n: get(
+                f'/api/v1/users/{self.user(n).username}/', **admin
+            ),
+            'users-me': lambda n: get(
+                '/api/v1/users/me/', **self.auth(self.user(n))
+            ),
+            'auth-signup': lambda n: post(
+                '/api/v1/auth/signup/',
+                {'username': f'bench{n}', 'email': f'bench{n}@yamdb.fake'},
+                REMOTE_ADDR=remote_addr(n),
+            ),
+            'auth-token': lambda n: post(
+                '/api/v1/auth/token/',
+                {'username': self.user(n).username,
+                 'confirmation_code': '00000'},
+                REMOTE_ADDR=remote_addr(n),
+            ),
+            'export-titles': lambda n: self.stream(
+                '/api/v1/export/titles.csv', **admin
+            ),
+        }
+
+    def call(self, name, request):
+        self.calls += 1
+        response = request(self.calls)
+        if response.status_code >= 500 or response.status_code in (
+            401, 403, 404, 429
+        ):
+            raise AssertionError(
+                f'{name}: ответ {response.status_code} '
+                f'{response.content[:200].decode(errors="replace")}'
+            )
+        return response
+
+    def measure(self, name, request):
+        """Метрики одного сценария."""
+
+        for _ in range(self.warmup):
+            self.call(name, request)
+        # request_started очищает журнал запросов, поэтому перед замером
+        # его очищаем и мы, а число запросов считаем сразу после ответа.
+        reset_queries()
+        with CaptureQueriesContext(connection) as context:
+            self.call(name, request)
+        queries = len(context.captured_queries)
+        tracemalloc.start()
+        try:
+            self.call(name, request)
+            memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        gc.collect()
+        timings = []
+        for _ in range(self.iterations):
+            started = time.perf_counter()
+            self.call(name, request)
+            timings.append((time.perf_counter() - started) * 1000)
+        return {
+            'p50_ms': round(percentile(timings, 0.5), 3),
+            'p99_ms': round(percentile(timings, 0.99), 3),
+            'queries': queries,
+            'memory_kb': round(memory / 1024, 1),
+        }
+
+    def run(self, names=None):
+        """Прогнать сценарии names (по умолчанию все)."""
+
+        self.prepare()
+        with override_settings(RESPONSE_CACHE_ENABLED=False):
+            return {
+                name: self.measure(name, request)
+                for name, request in self.scenarios().items()
+                if not names or name in names
+            }
+
+
+class Stampede:
+    """
+    Нагрузка на БД при массовом истечении кеша: сбрасывает группу кеша
+    и сразу отправляет workers одновременных запросов к url из разных
+    потоков. Каждый из rounds раундов начинается с прогретого кеша.
+    Считает SQL-запросы и пересчёты за раунд без защиты от лавины
+    промахов и с ней. Запросы идут из потоков одного процесса, поэтому
+    замер не отличает LocalLock от StoreLock между процессами.
+    """
+
+    def __init__(self, url, group, workers=16, rounds=5):
+        self.url = url
+        self.group = group
+        self.workers = workers
+        self.rounds = rounds
+
+    def request(self, barrier, results):
+        client = Client()
+        try:
+            barrier.wait()
+            started = time.perf_counter()
+            response = client.get(self.url)
+            results.append((
+                response.wsgi_request.query_report.count,
+                response['X-Cache'],
+                (time.perf_counter() - started) * 1000,
+            ))
+        finally:
+            connection.close()
+
+    def measure(self):
+        results = []
+        for _ in range(self.rounds):
+            Client().get(self.url)
+            bump_version(self.group)
+            barrier = threading.Barrier(self.workers)
+            threads = [
+                threading.Thread(target=self.request, args=(barrier, results))
+                for _ in range(self.workers)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        timings = [timing for _, _, timing in results]
+        return {
+            'queries': sum(count for count, _, _ in results) / self.rounds,
+            'recomputed': sum(
+                status == 'MISS' for _, status, _ in results
+            ) / self.rounds,
+            'stale': sum(
+                status == 'STALE' for _, status, _ in results
+            ) / self.rounds,
+            'p50_ms': round(percentile(timings, 0.5), 3),
+            'p99_ms': round(percentile(timings, 0.99), 3),
+        }
+
+    def run(self):
+        """Метрики на раунд: {'без защиты': ..., 'single-flight': ...}."""
+
+        results = {}
+        for name, single_flight in (
+            ('без защиты', False), ('single-flight', True)
+        ):
+            with override_settings(RESPONSE_CACHE_SINGLE_FLIGHT=single_flight):
+                results[name] = self.measure()
+        return results
+
+
+def compare(results, baseline,
+            latency_threshold=BENCHMARK_LATENCY_THRESHOLD,
+            queries_threshold=BENCHMARK_QUERIES_THRESHOLD,
+            memory_threshold=BENCHMARK_MEMORY_THRESHOLD):
+    """
+    Сравнить результаты с базовыми. Время и память — с допуском в долях
+    (0.5 — на 50% хуже), число запросов — в штуках. Время, выросшее
+    меньше чем на BENCHMARK_LATENCY_FLOOR_MS, регрессией не считается:
+    это шум. Возвращает список строк с описанием регрессий.
+    """
+
+    def latency(old, new):
+        return (
+            new > old * (1 + latency_threshold)
+            and new - old > BENCHMARK_LATENCY_FLOOR_MS
+        )
+
+    checks = {
+        'p50_ms': latency,
+        'p99_ms': latency,
+        'queries': lambda old, new: new > old + queries_threshold,
+        'memory_kb': lambda old, new: new > old * (1 + memory_threshold),
+    }
+    regressions = []
+    for name, metrics in results.items():
+        if name not in baseline:
+            continue
+        for metric, check in checks.items():
+            old, new = baseline[name][metric], metrics[metric]
+            if check(old, new):
+                regressions.append(f'{name}: {metric} {old} -> {new}')
+    return regressions
+
+
+def load_baseline(path):
+    with open(path, encoding='utf-8') as baseline_file:
+        return json.load(baseline_file)
+
+
+def save_baseline(path, results):
+    with open(path, 'w', encoding='utf-8') as baseline_file:
+        json.dump(results, baseline_file, indent=2, sort_keys=True)
+        baseline_file.write('\n')
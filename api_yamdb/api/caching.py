@@ -0,0 +1,461 @@
+import hashlib
+import math
+import pickle
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from reviews.models import Category, Genre, Review, Title, User
+
+from api_yamdb.const import (
+    RESPONSE_CACHE_EARLY_BETA,
+    RESPONSE_CACHE_LOCK_TIMEOUT,
+    RESPONSE_CACHE_LOCK_WAIT,
+    RESPONSE_CACHE_POLL_INTERVAL,
+    RESPONSE_CACHE_PURGE_PROBABILITY,
+    RESPONSE_CACHE_STALE_TIMEOUT,
+    RESPONSE_CACHE_TIMEOUT,
+)
+
+# Группа кеша -> модели, изменение которых сбрасывает её версию. Ответы
+# произведений включают категорию, жанры и рейтинг, поэтому их группа
+# зависит от всех четырёх моделей. Отзывы на произведение сбрасываются
+# отдельно по title_id, а все отзывы — при смене имени автора.
+CACHE_GROUPS = {
+    'titles': (Title, Category, Genre, Review),
+    'categories': (Category,),
+    'genres': (Genre,),
+    'reviews': (User,),
+}
+
+
+class BaseResponseStore(ABC):
+    """
+    Хранилище кеша ответов: значения любого типа, кроме None. Версии
+    групп хранятся в нём же, поэтому оно должно быть общим для всех
+    процессов: иначе изменение в одном процессе не сбросит кеш других.
+    """
+
+    @abstractmethod
+    def get_many(self, keys):
+        """Словарь {ключ: значение} для найденных ключей."""
+
+    @abstractmethod
+    def set(self, key, value, timeout):
+        """Записать значение на timeout секунд (None — без срока)."""
+
+    @abstractmethod
+    def add(self, key, value, timeout):
+        """Записать значение, только если ключа нет. Возвращает успех."""
+
+    @abstractmethod
+    def delete(self, key):
+        """Удалить ключ, если он есть."""
+
+    @abstractmethod
+    def delete_if(self, key, value):
+        """Удалить ключ, только если в нём value. Возвращает успех."""
+
+    def get(self, key):
+        return self.get_many([key]).get(key)
+
+
+class DjangoCacheStore(BaseResponseStore):
+    """
+    Кеш ответов в кеше Django из настройки CACHES. Бэкенд должен быть
+    общим для всех процессов (Redis, Memcached): с locmem хранилище не
+    создаётся.
+    """
+
+    def __init__(self):
+        if isinstance(caches[DEFAULT_CACHE_ALIAS], LocMemCache):
+            raise ImproperlyConfigured(
+                'DjangoCacheStore требует общий для процессов кеш Django, '
+                'а не locmem; используйте SQLiteResponseStore.'
+            )
+
+    def get_many(self, keys):
+        return cache.get_many(keys)
+
+    def set(self, key, value, timeout):
+        cache.set(key, value, timeout)
+
+    def add(self, key, value, timeout):
+        return cache.add(key, value, timeout)
+
+    def delete(self, key):
+        cache.delete(key)
+
+    def delete_if(self, key, value):
+        # В API кеша Django нет сравнения с удалением, поэтому между
+        # чтением и удалением ключ может смениться.
+        if cache.get(key) != value:
+            return False
+        return cache.delete(key)
+
+
+class SQLiteResponseStore(BaseResponseStore):
+    """
+    Кеш ответов в файле SQLite из настройки RESPONSE_CACHE_DB_PATH,
+    общий для всех процессов на машине, когда отдельного сервера кеша
+    нет. Значения хранятся в pickle, истёкшие записи не читаются. Ключи
+    ответов включают версии групп, и после сброса версии прежние ключи
+    никто не перезаписывает, поэтому с вероятностью
+    RESPONSE_CACHE_PURGE_PROBABILITY запись удаляет все истёкшие.
+    """
+
+    local = threading.local()
+
+    def get_connection(self):
+        path = str(settings.RESPONSE_CACHE_DB_PATH)
+        connections = self.local.__dict__.setdefault('connections', {})
+        if path not in connections:
+            connection = sqlite3.connect(
+                path, timeout=5, isolation_level=None
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=OFF')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS entry ('
+                'key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL)'
+            )
+            connection.execute(
+                'CREATE INDEX IF NOT EXISTS entry_expires ON entry (expires)'
+            )
+            connections[path] = connection
+        return connections[path]
+
+    def expires(self, timeout):
+        return None if timeout is None else time.time() + timeout
+
+    def purge_expired(self, connection):
+        if random.random() < RESPONSE_CACHE_PURGE_PROBABILITY:
+            connection.execute(
+                'DELETE FROM entry WHERE expires <= ?', (time.time(),)
+            )
+
+    def get_many(self, keys):
+        placeholders = ', '.join('?' * len(keys))
+        return {
+            key: pickle.loads(value)
+            for key, value in self.get_connection().execute(
+                f'SELECT key, value FROM entry WHERE key IN ({placeholders})'
+                ' AND (expires IS NULL OR expires > ?)',
+                (*keys, time.time()),
+            )
+        }
+
+    def set(self, key, value, timeout):
+        connection = self.get_connection()
+        connection.execute(
+            'INSERT OR REPLACE INTO entry (key, value, expires) '
+            'VALUES (?, ?, ?)',
+            (key, pickle.dumps(value), self.expires(timeout)),
+        )
+        self.purge_expired(connection)
+
+    def add(self, key, value, timeout):
+        connection = self.get_connection()
+        self.purge_expired(connection)
+        cursor = connection.execute(
+            'INSERT INTO entry (key, value, expires) VALUES (?, ?, ?) '
+            'ON CONFLICT (key) DO UPDATE SET value = excluded.value, '
+            'expires = excluded.expires '
+            'WHERE entry.expires IS NOT NULL AND entry.expires <= ?',
+            (key, pickle.dumps(value), self.expires(timeout), time.time()),
+        )
+        return cursor.rowcount == 1
+
+    def delete(self, key):
+        self.get_connection().execute(
+            'DELETE FROM entry WHERE key = ?', (key,)
+        )
+
+    def delete_if(self, key, value):
+        cursor = self.get_connection().execute(
+            'DELETE FROM entry WHERE key = ? AND value = ?',
+            (key, pickle.dumps(value)),
+        )
+        return cursor.rowcount == 1
+
+
+def get_response_store():
+    """Хранилище кеша ответов из настройки RESPONSE_CACHE_STORE."""
+
+    return import_string(settings.RESPONSE_CACHE_STORE)()
+
+
+class BaseLock(ABC):
+    """
+    Блокировка пересчёта ключа кеша. Блокировка снимается сама через
+    timeout секунд, если её владелец завершился, не сняв её. Снять её
+    может только владелец: блокировку, истёкшую за время долгого
+    пересчёта и захваченную другим запросом, прежний владелец не снимет.
+    """
+
+    @abstractmethod
+    def acquire(self, key, timeout):
+        """Захватить блокировку ключа. Возвращает токен владельца или None."""
+
+    @abstractmethod
+    def release(self, key, token):
+        """Снять блокировку ключа, если она ещё принадлежит token."""
+
+    @abstractmethod
+    def locked(self, key):
+        """Занята ли блокировка ключа."""
+
+
+class LocalLock(BaseLock):
+    """
+    Блокировка в памяти процесса: ключ пересчитывает один поток
+    процесса, но разные процессы друг друга не ждут.
+    """
+
+    mutex = threading.Lock()
+    held = {}
+
+    def acquire(self, key, timeout):
+        now = time.monotonic()
+        with self.mutex:
+            if self.held.get(key, (now,))[0] > now:
+                return None
+            token = uuid.uuid4().hex
+            self.held[key] = (now + timeout, token)
+            return token
+
+    def release(self, key, token):
+        with self.mutex:
+            if self.held.get(key, (0, None))[1] == token:
+                del self.held[key]
+
+    def locked(self, key):
+        return self.held.get(key, (0,))[0] > time.monotonic()
+
+
+class StoreLock(BaseLock):
+    """
+    Блокировка через атомарный add() хранилища кеша ответов. Общая для
+    всех процессов, если общее хранилище: SQLiteResponseStore или
+    кеш Django на отдельном сервере.
+    """
+
+    def get_key(self, key):
+        return f'lock:{key}'
+
+    def acquire(self, key, timeout):
+        token = uuid.uuid4().hex
+        if get_response_store().add(self.get_key(key), token, timeout):
+            return token
+        return None
+
+    def release(self, key, token):
+        get_response_store().delete_if(self.get_key(key), token)
+
+    def locked(self, key):
+        return get_response_store().get(self.get_key(key)) is not None
+
+
+def get_lock():
+    """Блокировка пересчёта из настройки RESPONSE_CACHE_LOCK."""
+
+    return import_string(settings.RESPONSE_CACHE_LOCK)()
+
+
+def version_key(group):
+    return f'response-version:{group}'
+
+
+def get_versions(store, groups):
+    """
+    Текущие версии групп. Версия — случайная строка: новая версия не
+    совпадает ни с одной прежней, даже если запись версии вытеснена
+    из кеша.
+    """
+
+    keys = [version_key(group) for group in groups]
+    versions = store.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            store.add(key, uuid.uuid4().hex, None)
+            versions[key] = store.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_version(group):
+    """Сбросить кеш группы после фиксации текущей транзакции."""
+
+    transaction.on_commit(
+        lambda: get_response_store().set(
+            version_key(group), uuid.uuid4().hex, None
+        )
+    )
+
+
+def bump_all_versions():
+    """
+    Сбросить кеш всех групп: для массовой записи в обход сигналов
+    (load_csv, generate_data). Группы отзывов отдельных произведений
+    не нужны — списки отзывов зависят и от общей группы reviews.
+    """
+
+    for group in CACHE_GROUPS:
+        bump_version(group)
+
+
+def get_audience(user):
+    """Круг пользователей, которым можно отдать один и тот же ответ."""
+
+    if not user.is_authenticated:
+        return 'anonymous'
+    if user.is_superuser:
+        return 'superuser'
+    return user.role
+
+
+def normalize_query(query_params):
+    """Параметры запроса в каноническом порядке."""
+
+    return urlencode(sorted(
+        (key, value)
+        for key, values in query_params.lists()
+        for value in values
+    ))
+
+
+def response_cache_key(request, versions):
+    """Ключ ответа: адрес, параметры, круг пользователей и версии групп."""
+
+    digest = hashlib.blake2b(
+        '\n'.join((
+            request.get_host(),
+            request.path,
+            normalize_query(request.query_params),
+            get_audience(request.user),
+            *versions,
+        )).encode('utf-8'),
+        digest_size=16,
+    )
+    return f'response:{digest.hexdigest()}'
+
+
+def invalidate_responses(sender, instance, raw=False, **kwargs):
+    """
+    Сбросить группы кеша, которые зависят от изменённой модели. Новый
+    пользователь ещё не автор отзывов, поэтому регистрация кеш не
+    сбрасывает.
+    """
+
+    if raw or sender is User and kwargs.get('created'):
+        return
+    for group, models in CACHE_GROUPS.items():
+        if sender in models:
+            bump_version(group)
+    if sender is Review:
+        bump_version(f'reviews:{instance.title_id}')
+
+
+# Обработчики подключаются только к моделям групп: сигнал удаления на
+# остальных моделях отключил бы быстрое каскадное удаление в Django.
+for model in {model for models in CACHE_GROUPS.values() for model in models}:
+    post_save.connect(invalidate_responses, sender=model)
+    post_delete.connect(invalidate_responses, sender=model)
+
+
+def is_fresh(entry, now, beta=RESPONSE_CACHE_EARLY_BETA):
+    """
+    Свежа ли запись (данные, срок, время пересчёта). Вероятностное
+    досрочное обновление: чем ближе срок и чем дольше пересчёт, тем
+    вероятнее запись будет признана устаревшей заранее, и её обновит
+    один запрос, а не все сразу в момент истечения.
+    """
+
+    _, expires, delta = entry
+    return now - delta * beta * math.log(1 - random.random()) < expires
+
+
+def refresh(store, key, compute):
+    """
+    Пересчитать значение и записать его в кеш, если compute вернул не
+    None. Запись хранится ещё RESPONSE_CACHE_STALE_TIMEOUT секунд после
+    срока, чтобы её можно было отдать, пока другой запрос её обновляет.
+    """
+
+    started = time.perf_counter()
+    value = compute()
+    if value is not None:
+        store.set(
+            key,
+            (
+                value,
+                time.time() + RESPONSE_CACHE_TIMEOUT,
+                time.perf_counter() - started,
+            ),
+            RESPONSE_CACHE_TIMEOUT + RESPONSE_CACHE_STALE_TIMEOUT,
+        )
+    return value
+
+
+def wait_for(store, lock, key):
+    """
+    Подождать, пока владелец блокировки запишет значение, но не дольше
+    RESPONSE_CACHE_LOCK_WAIT секунд. Возвращает запись или None.
+    """
+
+    deadline = time.monotonic() + RESPONSE_CACHE_LOCK_WAIT
+    while lock.locked(key) and time.monotonic() < deadline:
+        time.sleep(RESPONSE_CACHE_POLL_INTERVAL)
+    return store.get(key)
+
+
+def get_or_compute(store, key, compute):
+    """
+    Значение ключа из кеша или от compute() с защитой от лавины
+    промахов: устаревшее значение пересчитывает один запрос, остальные
+    в это время получают прежнее значение, а если его нет — ждут
+    пересчёта. Возвращает значение и статус: HIT, STALE или MISS
+    (значение посчитано этим запросом).
+    """
+
+    entry = store.get(key)
+    if entry is not None and is_fresh(entry, time.time()):
+        return entry[0], 'HIT'
+    if not settings.RESPONSE_CACHE_SINGLE_FLIGHT:
+        return refresh(store, key, compute), 'MISS'
+    lock = get_lock()
+    token = lock.acquire(key, RESPONSE_CACHE_LOCK_TIMEOUT)
+    if token:
+        try:
+            # Пока мы ждали блокировку, значение мог обновить другой.
+            current = store.get(key)
+            if current is not None and current[1:] != (entry or ())[1:]:
+                return current[0], 'HIT'
+            return refresh(store, key, compute), 'MISS'
+        finally:
+            lock.release(key, token)
+    if entry is not None:
+        return entry[0], 'STALE'
+    entry = wait_for(store, lock, key)
+    if entry is not None:
+        return entry[0], 'HIT'
+    return refresh(store, key, compute), 'MISS'
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, action, **kwargs):
+    """Жанры произведения входят в его ответ."""
+
+    if action.startswith('post_'):
+        bump_version('titles')
@@ -0,0 +1,104 @@
+from abc import ABC, abstractmethod
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.module_loading import import_string
+from reviews.models import EmailConfirmation
+
+from api_yamdb.const import CONFIRMATION_CODE_TTL
+
+from .utils import generate_user_confirmation_code
+
+
+def hash_confirmation_code(user_id, code):
+    """Хеш кода подтверждения, привязанный к пользователю и SECRET_KEY."""
+
+    return salted_hmac(
+        'confirmation-code', f'{user_id}:{code}', algorithm='sha256'
+    ).hexdigest()
+
+
+class BaseCodeStore(ABC):
+    """
+    Хранилище кодов подтверждения. Коды хранятся только в виде хеша,
+    живут CONFIRMATION_CODE_TTL секунд и действуют один раз.
+    """
+
+    ttl = CONFIRMATION_CODE_TTL
+
+    def issue(self, user):
+        """Выдать пользователю новый код взамен прежнего."""
+
+        code = generate_user_confirmation_code()
+        self.save(user.pk, hash_confirmation_code(user.pk, code))
+        return code
+
+    @abstractmethod
+    def save(self, user_id, code_hash):
+        """Сохранить хеш кода пользователя взамен прежнего."""
+
+    @abstractmethod
+    def check(self, user, code):
+        """Проверить и погасить код. True, если код верный и не истёк."""
+
+    def purge_expired(self):
+        """Удалить истёкшие коды. Возвращает количество удалённых."""
+
+        return 0
+
+
+class DatabaseCodeStore(BaseCodeStore):
+    """Коды в узкой таблице EmailConfirmation, по строке на пользователя."""
+
+    def save(self, user_id, code_hash):
+        expires_at = timezone.now() + timedelta(seconds=self.ttl)
+        # update_or_create блокирует строку в своей транзакции, и
+        # одновременная повторная регистрация не упадёт на уникальности.
+        EmailConfirmation.objects.update_or_create(
+            user_id=user_id,
+            defaults={'code_hash': code_hash, 'expires_at': expires_at},
+        )
+
+    def check(self, user, code):
+        deleted, _ = EmailConfirmation.objects.filter(
+            user_id=user.pk,
+            code_hash=hash_confirmation_code(user.pk, code),
+            expires_at__gt=timezone.now(),
+        ).delete()
+        return bool(deleted)
+
+    def purge_expired(self):
+        deleted, _ = EmailConfirmation.objects.filter(
+            expires_at__lte=timezone.now()
+        ).delete()
+        return deleted
+
+
+class CacheCodeStore(BaseCodeStore):
+    """Коды в кеше Django: срок действия обеспечивает сам кеш."""
+
+    def get_key(self, user_id):
+        return f'confirmation-code:{user_id}'
+
+    def save(self, user_id, code_hash):
+        cache.set(self.get_key(user_id), code_hash, self.ttl)
+
+    def check(self, user, code):
+        key = self.get_key(user.pk)
+        code_hash = cache.get(key)
+        if code_hash is None or not constant_time_compare(
+            code_hash, hash_confirmation_code(user.pk, code)
+        ):
+            return False
+        # Код гасит только тот из одновременных запросов, чьё удаление
+        # прошло.
+        return cache.delete(key)
+
+
+def get_code_store():
+    """Хранилище кодов из настройки CONFIRMATION_CODE_STORE."""
+
+    return import_string(settings.CONFIRMATION_CODE_STORE)()
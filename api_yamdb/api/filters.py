@@ -1,27 +1,90 @@
+from django.db import connection
+from django.db.models import Count, Q
 from django_filters import rest_framework as filters
-from reviews.models import Title
+from reviews.models import Category, Title
+from reviews.search import build_match_query
+
+GENRE_MODES = (
+    ('any', 'Любой из жанров'),
+    ('all', 'Все жанры'),
+)
+
+
+def split_slugs(value):
+    """Разобрать список слагов через запятую без пустых и повторов."""
+
+    return {slug.strip() for slug in value.split(',') if slug.strip()}
 
 
 class TitleFilter(filters.FilterSet):
     """Фильтр для модели произведений."""
 
-    category = filters.CharFilter(
-        field_name='category__slug',
-        lookup_expr='icontains',
+    category = filters.CharFilter(method='filter_category')
+    genre = filters.CharFilter(method='filter_genre')
+    genre_mode = filters.ChoiceFilter(
+        choices=GENRE_MODES,
+        method='filter_genre_mode',
     )
-    genre = filters.CharFilter(
-        field_name='genre__slug',
-        lookup_expr='icontains',
-    )
-    name = filters.CharFilter(
-        field_name='name',
-        lookup_expr='icontains',
+    name = filters.CharFilter(method='filter_search')
+    q = filters.CharFilter(method='filter_search')
+    year = filters.NumberFilter(field_name='year')
+    year_min = filters.NumberFilter(
+        field_name='year',
+        lookup_expr='gte',
     )
-    year = filters.NumberFilter(
+    year_max = filters.NumberFilter(
         field_name='year',
-        lookup_expr='icontains',
+        lookup_expr='lte',
     )
 
     class Meta:
         model = Title
         fields = '__all__'
+
+    def filter_category(self, queryset, name, value):
+        """Произведения из любой из перечисленных категорий."""
+
+        return queryset.filter(
+            category_id__in=Category.objects.filter(
+                slug__in=split_slugs(value)
+            ).values('id')
+        )
+
+    def filter_genre(self, queryset, name, value):
+        """
+        Произведения с любым (genre_mode=any) или со всеми (all)
+        перечисленными жанрами. Отбор идёт подзапросом по промежуточной
+        таблице, поэтому произведения в выдаче не дублируются.
+        """
+
+        slugs = split_slugs(value)
+        matched = Title.genre.through.objects.filter(genre__slug__in=slugs)
+        if self.form.cleaned_data.get('genre_mode') == 'all':
+            matched = (
+                matched.values('title_id')
+                .annotate(matched=Count('genre_id', distinct=True))
+                .filter(matched=len(slugs))
+            )
+        return queryset.filter(id__in=matched.values('title_id'))
+
+    def filter_genre_mode(self, queryset, name, value):
+        """Режим учитывается в filter_genre."""
+
+        return queryset
+
+    def filter_search(self, queryset, name, value):
+        """
+        Полнотекстовый поиск с ранжированием: name ищет по названию,
+        q — по названию и описанию. Без FTS5 (не SQLite) — icontains.
+        """
+
+        match = build_match_query(value)
+        if connection.vendor != 'sqlite' or match is None:
+            condition = Q(name__icontains=value)
+            if name == 'q':
+                condition |= Q(description__icontains=value)
+            return queryset.filter(condition)
+        column = 'name' if name == 'name' else 'document'
+        return queryset.filter(
+            **{f'search__{column}__match': match}
+        ).order_by('search__rank')
@@ -0,0 +1,158 @@
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+from api.benchmark import (
+    METRICS,
+    STAMPEDE_METRICS,
+    Benchmark,
+    Stampede,
+    compare,
+    load_baseline,
+    save_baseline,
+)
+from api_yamdb.const import (
+    BENCHMARK_LATENCY_THRESHOLD,
+    BENCHMARK_MEMORY_THRESHOLD,
+    BENCHMARK_QUERIES_THRESHOLD,
+)
+from reviews.synthetic import DatasetGenerator
+
+
+class Command(BaseCommand):
+    """
+    Замеряет маршруты API на сгенерированных данных во временной
+    тестовой БД и сравнивает результаты с сохранёнными базовыми.
+    """
+
+    help = 'Замерить время ответа, запросы к БД и память по маршрутам API.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--baseline',
+            type=Path,
+            default=Path(settings.BASE_DIR) / 'benchmark_baseline.json',
+            help='Файл с базовыми результатами.',
+        )
+        parser.add_argument(
+            '--update-baseline',
+            action='store_true',
+            help='Записать результаты как новые базовые.',
+        )
+        parser.add_argument(
+            '--scenario',
+            action='append',
+            help='Замерить только этот сценарий (можно несколько раз).',
+        )
+        parser.add_argument('--iterations', type=int, default=100)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument(
+            '--latency-threshold',
+            type=float,
+            default=BENCHMARK_LATENCY_THRESHOLD,
+            help='Допустимое ухудшение p50/p99 в долях (0.5 — на 50%%).',
+        )
+        parser.add_argument(
+            '--queries-threshold',
+            type=int,
+            default=BENCHMARK_QUERIES_THRESHOLD,
+            help='Сколько лишних запросов к БД допустимо.',
+        )
+        parser.add_argument(
+            '--memory-threshold',
+            type=float,
+            default=BENCHMARK_MEMORY_THRESHOLD,
+            help='Допустимый рост пика памяти в долях.',
+        )
+        for name, default in (
+            ('users', 2000),
+            ('titles', 1000),
+            ('reviews', 50000),
+            ('comments', 50000),
+        ):
+            parser.add_argument(f'--{name}', type=int, default=default)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--stampede',
+            type=int,
+            default=0,
+            metavar='WORKERS',
+            help='Вместо сценариев замерить нагрузку на БД при массовом '
+                 'истечении кеша с WORKERS одновременными запросами.',
+        )
+        parser.add_argument('--rounds', type=int, default=5)
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                results = self.run_benchmark(Path(directory), options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        if options['stampede']:
+            self.report(results, STAMPEDE_METRICS)
+            return
+        self.report(results)
+        if options['update_baseline']:
+            save_baseline(options['baseline'], results)
+            self.stdout.write(self.style.SUCCESS(
+                f'Базовые результаты записаны в {options["baseline"]}'
+            ))
+            return
+        regressions = compare(
+            results,
+            load_baseline(options['baseline']),
+            options['latency_threshold'],
+            options['queries_threshold'],
+            options['memory_threshold'],
+        )
+        for regression in regressions:
+            self.stdout.write(self.style.ERROR(regression))
+        if regressions:
+            raise CommandError(f'Регрессий: {len(regressions)}')
+        self.stdout.write(self.style.SUCCESS('Регрессий нет'))
+
+    def run_benchmark(self, directory, options):
+        """Сгенерировать данные и прогнать сценарии."""
+
+        with override_settings(
+            DEBUG=False,
+            THROTTLE_DB_PATH=directory / 'throttle.sqlite3',
+            METRICS_DIR=directory / 'metrics',
+            RESPONSE_CACHE_DB_PATH=directory / 'response_cache.sqlite3',
+        ):
+            DatasetGenerator(seed=options['seed']).generate(
+                options['users'], 10, 24, options['titles'],
+                options['reviews'], options['comments'],
+            )
+            if options['stampede']:
+                return Stampede(
+                    '/api/v1/titles/?limit=100', 'titles',
+                    options['stampede'], options['rounds'],
+                ).run()
+            return Benchmark(
+                options['iterations'], options['warmup']
+            ).run(options['scenario'])
+
+    def report(self, results, columns=METRICS):
+        self.stdout.write(
+            f'{"сценарий":<24}' + ''.join(f'{name:>12}' for name in columns)
+        )
+        for name, metrics in results.items():
+            self.stdout.write(
+                f'{name:<24}'
+                + ''.join(f'{metrics[metric]:>12}' for metric in columns)
+            )
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from api.profiling import merge_stacks, profile_paths
+
+
+class Command(BaseCommand):
+    """
+    Сводит стеки профилировщика в один свёрнутый файл для flamegraph.pl
+    или speedscope: одинаковые стеки из разных запросов и процессов
+    складываются.
+    """
+
+    help = 'Свести стеки профилировщика из PROFILER_DIR для flamegraph.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'views', nargs='*',
+            help='Имена представлений, например api:titles-list. '
+                 'По умолчанию — все.',
+        )
+        parser.add_argument('--path', default=settings.PROFILER_DIR)
+
+    def handle(self, *args, **options):
+        try:
+            merged = merge_stacks(
+                profile_paths(options['path'], options['views'])
+            )
+        except FileNotFoundError as error:
+            raise CommandError(f'Нет стеков: {error.filename}')
+        for stack, weight in sorted(merged.items()):
+            self.stdout.write(f'{stack} {weight}')
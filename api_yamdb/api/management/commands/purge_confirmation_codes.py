@@ -0,0 +1,15 @@
+from django.core.management import BaseCommand
+
+from api.confirmation import get_code_store
+
+
+class Command(BaseCommand):
+    """Удаляет истёкшие коды подтверждения одним запросом."""
+
+    help = 'Удалить истёкшие коды подтверждения.'
+
+    def handle(self, *args, **options):
+        deleted = get_code_store().purge_expired()
+        self.stdout.write(
+            self.style.SUCCESS(f'Удалено истёкших кодов: {deleted}')
+        )
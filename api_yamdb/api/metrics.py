@@ -0,0 +1,255 @@
+import glob
+import mmap
+import os
+import struct
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.utils.crypto import constant_time_compare
+
+from api_yamdb.const import METRICS_BUCKETS, METRICS_FILE_SIZE
+
+# Вектор значений маршрута: число запросов, сумма времени ответа,
+# попадания в корзины гистограммы (последняя — +Inf), затем суммы
+# SQL-запросов, времени в БД, времени сериализации и размера ответа.
+REQUESTS, DURATION, FIRST_BUCKET = 0, 1, 2
+DB_QUERIES = FIRST_BUCKET + len(METRICS_BUCKETS) + 1
+DB_DURATION, SERIALIZATION, RESPONSE_BYTES = (
+    DB_QUERIES + 1, DB_QUERIES + 2, DB_QUERIES + 3
+)
+VECTOR = struct.Struct(f'<{RESPONSE_BYTES + 1}d')
+HEADER = struct.Struct('<Q')
+KEY_LENGTH = struct.Struct('<I')
+
+COUNTERS = (
+    (DB_QUERIES, 'yamdb_db_queries_total', 'SQL-запросов к БД.'),
+    (DB_DURATION, 'yamdb_db_duration_seconds_total', 'Время в БД.'),
+    (SERIALIZATION, 'yamdb_serialization_seconds_total',
+     'Время сериализации ответа.'),
+    (RESPONSE_BYTES, 'yamdb_response_bytes_total', 'Размер ответов.'),
+)
+
+# Прочие методы учитываются как other: метод приходит от клиента, и
+# произвольные значения плодили бы ряды метрик.
+HTTP_METHODS = frozenset((
+    'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS', 'TRACE',
+    'CONNECT',
+))
+
+serialization_time = ContextVar('serialization_time', default=None)
+
+
+def _entry_size(key_bytes):
+    padded = (KEY_LENGTH.size + len(key_bytes) + 7) // 8 * 8
+    return padded, padded + VECTOR.size
+
+
+def read_entries(data):
+    """Разобрать содержимое файла метрик: пары (ключ, вектор)."""
+
+    used = HEADER.unpack_from(data, 0)[0] if len(data) >= HEADER.size else 0
+    offset = HEADER.size
+    while offset < used:
+        length = KEY_LENGTH.unpack_from(data, offset)[0]
+        key = data[
+            offset + KEY_LENGTH.size:offset + KEY_LENGTH.size + length
+        ]
+        padded, size = _entry_size(key)
+        yield (
+            key.decode('utf-8'),
+            VECTOR.unpack_from(data, offset + padded),
+            offset + padded,
+        )
+        offset += size
+
+
+class MetricsFile:
+    """
+    Метрики одного процесса в файле, отображённом в память. Каждый
+    процесс пишет только в свой файл metrics-<pid>.db, поэтому между
+    процессами блокировки не нужны; /metrics суммирует все файлы.
+    Записи только добавляются: ключ, затем вектор значений VECTOR.
+    """
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f'metrics-{os.getpid()}.db')
+        self.lock = threading.Lock()
+        self.file = open(self.path, 'a+b')
+        if os.path.getsize(self.path) < METRICS_FILE_SIZE:
+            self.file.truncate(METRICS_FILE_SIZE)
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        self.used = HEADER.unpack_from(self.map, 0)[0] or HEADER.size
+        self.vectors = {}
+        self.offsets = {}
+        for key, vector, offset in read_entries(self.map):
+            self.vectors[key] = list(vector)
+            self.offsets[key] = offset
+
+    def add(self, key, values):
+        """Прибавить values (словарь индекс -> число) к вектору ключа."""
+
+        with self.lock:
+            vector = self.vectors.get(key)
+            if vector is None:
+                vector = self.append(key)
+            for index, value in values.items():
+                vector[index] += value
+            VECTOR.pack_into(self.map, self.offsets[key], *vector)
+
+    def append(self, key):
+        key_bytes = key.encode('utf-8')
+        padded, size = _entry_size(key_bytes)
+        if self.used + size > len(self.map):
+            self.map.close()
+            self.file.truncate(2 * (self.used + size))
+            self.map = mmap.mmap(self.file.fileno(), 0)
+        KEY_LENGTH.pack_into(self.map, self.used, len(key_bytes))
+        self.map[
+            self.used + KEY_LENGTH.size:
+            self.used + KEY_LENGTH.size + len(key_bytes)
+        ] = key_bytes
+        self.offsets[key] = self.used + padded
+        self.vectors[key] = [0.0] * (VECTOR.size // 8)
+        self.used += size
+        HEADER.pack_into(self.map, 0, self.used)
+        return self.vectors[key]
+
+
+_files = {}
+_files_lock = threading.Lock()
+
+
+def get_metrics_file():
+    """Файл метрик текущего процесса в каталоге METRICS_DIR."""
+
+    key = (str(settings.METRICS_DIR), os.getpid())
+    metrics_file = _files.get(key)
+    if metrics_file is None:
+        with _files_lock:
+            metrics_file = _files.get(key)
+            if metrics_file is None:
+                metrics_file = _files[key] = MetricsFile(key[0])
+    return metrics_file
+
+
+def observe(route, method, duration, db_queries, db_duration,
+            serialization, response_bytes):
+    """Учесть один HTTP-запрос."""
+
+    bucket = FIRST_BUCKET + len(METRICS_BUCKETS)
+    for index, bound in enumerate(METRICS_BUCKETS):
+        if duration <= bound:
+            bucket = FIRST_BUCKET + index
+            break
+    if method not in HTTP_METHODS:
+        method = 'other'
+    get_metrics_file().add(f'{route}\x00{method}', {
+        REQUESTS: 1,
+        DURATION: duration,
+        bucket: 1,
+        DB_QUERIES: db_queries,
+        DB_DURATION: db_duration,
+        SERIALIZATION: serialization,
+        RESPONSE_BYTES: response_bytes,
+    })
+
+
+def metrics_allowed(request):
+    """
+    Можно ли отдать метрики: запрос с адреса из METRICS_ALLOWED_IPS или
+    с заголовком Authorization: Bearer <METRICS_TOKEN>.
+    """
+
+    if request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS:
+        return True
+    return bool(settings.METRICS_TOKEN) and constant_time_compare(
+        request.META.get('HTTP_AUTHORIZATION', ''),
+        f'Bearer {settings.METRICS_TOKEN}',
+    )
+
+
+def collect(directory):
+    """Сумма векторов по всем файлам метрик каталога."""
+
+    totals = {}
+    for path in glob.glob(os.path.join(directory, 'metrics-*.db')):
+        with open(path, 'rb') as metrics_file:
+            data = metrics_file.read()
+        for key, vector, _ in read_entries(data):
+            total = totals.setdefault(key, [0.0] * len(vector))
+            for index, value in enumerate(vector):
+                total[index] += value
+    return totals
+
+
+def _number(value):
+    return repr(int(value)) if value == int(value) else repr(value)
+
+
+def render_metrics(directory):
+    """Метрики всех процессов в текстовом формате Prometheus."""
+
+    totals = sorted(collect(directory).items())
+    lines = [
+        '# HELP yamdb_http_requests_total Запросов к API.',
+        '# TYPE yamdb_http_requests_total counter',
+    ]
+    labels = {}
+    for key, vector in totals:
+        route, method = key.split('\x00')
+        labels[key] = f'route="{route}",method="{method}"'
+        lines.append(
+            f'yamdb_http_requests_total{{{labels[key]}}} '
+            f'{_number(vector[REQUESTS])}'
+        )
+    lines += [
+        '# HELP yamdb_http_request_duration_seconds Время ответа.',
+        '# TYPE yamdb_http_request_duration_seconds histogram',
+    ]
+    bounds = [repr(bound) for bound in METRICS_BUCKETS] + ['+Inf']
+    for key, vector in totals:
+        cumulative = 0
+        for index, bound in enumerate(bounds):
+            cumulative += vector[FIRST_BUCKET + index]
+            lines.append(
+                'yamdb_http_request_duration_seconds_bucket'
+                f'{{{labels[key]},le="{bound}"}} {_number(cumulative)}'
+            )
+        lines.append(
+            f'yamdb_http_request_duration_seconds_sum{{{labels[key]}}} '
+            f'{_number(vector[DURATION])}'
+        )
+        lines.append(
+            f'yamdb_http_request_duration_seconds_count{{{labels[key]}}} '
+            f'{_number(vector[REQUESTS])}'
+        )
+    for index, name, description in COUNTERS:
+        lines += [f'# HELP {name} {description}', f'# TYPE {name} counter']
+        lines.extend(
+            f'{name}{{{labels[key]}}} {_number(vector[index])}'
+            for key, vector in totals
+        )
+    return '\n'.join(lines) + '\n'
+
+
+class TimedRepresentationMixin:
+    """
+    Учитывает время to_representation в метриках запроса. Вложенные
+    сериализаторы не считаются повторно: время засекается только на
+    внешнем вызове.
+    """
+
+    def to_representation(self, instance):
+        spent = serialization_time.get()
+        if spent is None or spent[1]:
+            return super().to_representation(instance)
+        spent[1] = True
+        started = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            spent[1] = False
+            spent[0] += time.perf_counter() - started
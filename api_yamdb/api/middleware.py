@@ -0,0 +1,207 @@
+import logging
+import random
+import re
+import sys
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from rest_framework.exceptions import APIException
+
+from api_yamdb.const import PROFILER_HEADER, QUERY_REPEAT_LIMIT
+
+from .authentication import CachedUserJWTAuthentication
+from .metrics import observe, serialization_time
+from .profiling import StackProfiler, save_stacks
+
+logger = logging.getLogger(__name__)
+
+IN_LIST = re.compile(r'\((?:%s, )+%s\)')
+SAVEPOINT = re.compile(r'"s\d+_x\d+"')
+
+
+class QueryBudgetExceeded(Exception):
+    """Запрос к API выполнил больше SQL-запросов, чем разрешено."""
+
+
+def fingerprint(sql):
+    """Форма SQL-запроса: списки IN и имена точек сохранения схлопнуты."""
+
+    return SAVEPOINT.sub('"s"', IN_LIST.sub('(%s, ...)', sql))
+
+
+def get_query_budget(view_func, method):
+    """
+    Бюджет запросов из атрибута query_budget класса представления:
+    число для всех действий или словарь {действие: число} у вьюсетов.
+    """
+
+    view_class = getattr(view_func, 'cls', None)
+    budget = getattr(view_class, 'query_budget', None)
+    if isinstance(budget, dict):
+        actions = getattr(view_func, 'actions', None) or {}
+        budget = budget.get(actions.get(method.lower()))
+    return budget
+
+
+class QueryReport:
+    """
+    Статистика SQL-запросов одного HTTP-запроса. Подключается через
+    connection.execute_wrapper и стоит пару вызовов perf_counter на
+    запрос к БД.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+        self.view_name = None
+        self.budget = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def repeated(self, limit=QUERY_REPEAT_LIMIT):
+        """Формы запросов, выполненные больше limit раз: признак N+1."""
+
+        return {
+            sql: count for sql, count in self.fingerprints.items()
+            if count > limit
+        }
+
+    def problems(self, limit=QUERY_REPEAT_LIMIT):
+        """Описания нарушений: превышен бюджет или есть N+1."""
+
+        problems = []
+        if self.budget is not None and self.count > self.budget:
+            problems.append(
+                f'{self.count} SQL-запросов при бюджете {self.budget}'
+            )
+        problems.extend(
+            f'N+1: {count} раз {sql}'
+            for sql, count in self.repeated(limit).items()
+        )
+        return problems
+
+
+class QueryInspectorMiddleware:
+    """
+    Считает SQL-запросы, время в БД и повторяющиеся формы запросов для
+    каждого HTTP-запроса; отчёт доступен как request.query_report.
+    При превышении query_budget представления или N+1 (форма запроса
+    повторилась больше QUERY_REPEAT_LIMIT раз) пишет предупреждение с
+    именем представления, а при QUERY_INSPECTOR_RAISE — бросает
+    QueryBudgetExceeded, как нужно в тестах.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        report = request.query_report = QueryReport()
+        with connection.execute_wrapper(report):
+            response = self.get_response(request)
+        logger.debug(
+            '%s: %d SQL-запросов, %.1f мс',
+            report.view_name, report.count, report.duration * 1000,
+        )
+        problems = report.problems()
+        if problems:
+            message = f'{report.view_name}: {"; ".join(problems)}'
+            if settings.QUERY_INSPECTOR_RAISE:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        report = request.query_report
+        report.view_name = request.resolver_match.view_name
+        report.budget = get_query_budget(view_func, request.method)
+
+
+class MetricsMiddleware:
+    """
+    Собирает метрики запросов к API по маршруту и методу: время ответа,
+    SQL-запросы и время в БД (из QueryInspectorMiddleware), время
+    сериализации и размер ответа. Метрики отдаёт представление /metrics.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        spent = [0.0, False]
+        token = serialization_time.set(spent)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            serialization_time.reset(token)
+        duration = time.perf_counter() - started
+        match = request.resolver_match
+        report = getattr(request, 'query_report', None)
+        observe(
+            match.view_name if match else 'unmatched',
+            request.method,
+            duration,
+            report.count if report else 0,
+            report.duration if report else 0.0,
+            spent[0],
+            0 if response.streaming else len(response.content),
+        )
+        return response
+
+
+class ProfilerMiddleware:
+    """
+    Профилирует долю PROFILER_SAMPLE_RATE запросов, а также запросы
+    администратора с заголовком X-Profile, и дописывает стеки в файл
+    представления в каталоге PROFILER_DIR. При PROFILER_ENABLED = False
+    Django не включает middleware в цепочку, и накладных расходов нет.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILER_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.authentication = CachedUserJWTAuthentication()
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+        profiler = StackProfiler()
+        sys.setprofile(profiler)
+        try:
+            response = self.get_response(request)
+        finally:
+            sys.setprofile(None)
+        match = request.resolver_match
+        save_stacks(
+            settings.PROFILER_DIR,
+            match.view_name if match else 'unmatched',
+            profiler.stacks,
+        )
+        return response
+
+    def should_profile(self, request):
+        if PROFILER_HEADER in request.META:
+            return self.is_admin(request)
+        return random.random() < settings.PROFILER_SAMPLE_RATE
+
+    def is_admin(self, request):
+        try:
+            result = self.authentication.authenticate(request)
+        except APIException:
+            return False
+        if result is None:
+            return False
+        user = result[0]
+        return user.is_admin or user.is_superuser
@@ -1,21 +1,81 @@
+from django.conf import settings
 from rest_framework import filters
 from rest_framework.mixins import (
     CreateModelMixin,
     DestroyModelMixin,
     ListModelMixin,
 )
-from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
+from .caching import (
+    get_or_compute,
+    get_response_store,
+    get_versions,
+    response_cache_key,
+)
+from .pagination import LimitOffsetKeysetPagination
 from .permissions import IsAdminOrReadOnly
 
 
+class CachedResponseMixin:
+    """
+    Кеширует данные успешных ответов GET с защитой от лавины промахов
+    (get_or_compute). Ключ учитывает адрес, параметры запроса, круг
+    пользователей и версии групп cache_groups (имена могут ссылаться
+    на kwargs маршрута: 'reviews:{title_id}').
+    Права проверяются до обращения к кешу, в initial(). Настройка
+    RESPONSE_CACHE_ENABLED = False отключает кеш, например для замеров.
+    """
+
+    cache_groups = ()
+
+    def get_cache_groups(self):
+        return [group.format(**self.kwargs) for group in self.cache_groups]
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if not settings.RESPONSE_CACHE_ENABLED:
+            return handler(request, *args, **kwargs)
+        store = get_response_store()
+        key = response_cache_key(
+            request, get_versions(store, self.get_cache_groups())
+        )
+        computed = []
+
+        def compute():
+            response = handler(request, *args, **kwargs)
+            computed.append(response)
+            return response.data if response.status_code == 200 else None
+
+        data, status = get_or_compute(store, key, compute)
+        response = computed[0] if computed else Response(data)
+        response['X-Cache'] = status
+        return response
+
+
+class CachedListMixin(CachedResponseMixin):
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+
+class CachedRetrieveMixin(CachedResponseMixin):
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
 class ModelMixinSet(
-    CreateModelMixin, ListModelMixin, DestroyModelMixin, GenericViewSet
+    CachedListMixin,
+    CreateModelMixin,
+    ListModelMixin,
+    DestroyModelMixin,
+    GenericViewSet,
 ):
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
     http_method_names = ['get', 'post', 'patch', 'delete']
-    pagination_class = LimitOffsetPagination
+    pagination_class = LimitOffsetKeysetPagination
+    query_budget = {'list': 2, 'create': 4, 'destroy': 4}
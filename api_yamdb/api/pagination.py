@@ -0,0 +1,164 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as DecodeError
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from api_yamdb.const import MAX_PAGE_SIZE
+
+
+class LimitOffsetKeysetPagination(LimitOffsetPagination):
+    """
+    Пагинация limit/offset с режимом keyset по параметру cursor.
+    Запрос с ?cursor= (пустым или из ссылок next/previous) переключает
+    пагинацию на выборку по ключу ordering без COUNT(*) и OFFSET.
+    """
+
+    cursor_query_param = 'cursor'
+    cursor_query_description = 'Курсор страницы в режиме keyset.'
+    invalid_cursor_message = 'Неверный курсор.'
+    max_limit = MAX_PAGE_SIZE
+    ordering = ('id',)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.cursor_query_param in request.query_params
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.limit = self.get_limit(request)
+        values, reverse = self.decode_cursor(request, queryset.model)
+        queryset = queryset.order_by(
+            *(f'-{field}' if reverse else field for field in self.ordering)
+        )
+        if values is not None:
+            queryset = queryset.filter(self.get_keyset_filter(values, reverse))
+        page = list(queryset[:self.limit + 1])
+        has_more = len(page) > self.limit
+        page = page[:self.limit]
+        if reverse:
+            page.reverse()
+        self.page = page
+        if reverse:
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, values is not None
+        if self.has_next or self.has_previous:
+            self.display_page_controls = True
+        return page
+
+    def get_keyset_filter(self, values, reverse):
+        """Условие «строго после ключа» для составного ordering."""
+
+        lookup = 'lt' if reverse else 'gt'
+        condition = Q()
+        for position, field in enumerate(self.ordering):
+            equal = {
+                previous: value
+                for previous, value in zip(self.ordering[:position], values)
+            }
+            condition |= Q(**equal, **{f'{field}__{lookup}': values[position]})
+        return condition
+
+    def decode_cursor(self, request, model):
+        """
+        Разобрать курсор: значения ключа, приведённые к типам полей
+        ordering модели, и направление выборки.
+        """
+
+        encoded = request.query_params[self.cursor_query_param]
+        if not encoded:
+            return None, False
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            values, reverse = cursor['v'], bool(cursor.get('r'))
+        except (DecodeError, KeyError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            values = [
+                model._meta.get_field(field).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except (ValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if None in values:
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    def encode_cursor(self, instance, reverse):
+        """Закодировать ключ объекта в непрозрачный курсор."""
+
+        values = []
+        for field in self.ordering:
+            value = getattr(instance, field)
+            if hasattr(value, 'isoformat'):
+                value = value.isoformat()
+            values.append(value)
+        cursor = {'v': values, 'r': int(reverse)}
+        encoded = urlsafe_b64encode(
+            json.dumps(cursor, separators=(',', ':')).encode('ascii')
+        ).decode('ascii')
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.offset_query_param)
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.keyset:
+            return super().get_previous_link()
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_html_context(self):
+        if not self.keyset:
+            return super().get_html_context()
+        return {
+            'previous_url': self.get_previous_link(),
+            'next_url': self.get_next_link(),
+        }
+
+    def to_html(self):
+        if self.keyset:
+            self.template = 'rest_framework/pagination/previous_and_next.html'
+        return super().to_html()
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        parameters.append({
+            'name': self.cursor_query_param,
+            'required': False,
+            'in': 'query',
+            'description': self.cursor_query_description,
+            'schema': {'type': 'string'},
+        })
+        return parameters
+
+
+class PubDateKeysetPagination(LimitOffsetKeysetPagination):
+    """Пагинация отзывов и комментариев по ключу (pub_date, id)."""
+
+    ordering = ('pub_date', 'id')
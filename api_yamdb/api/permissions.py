@@ -38,6 +38,6 @@ class AdminModeratorAuthorOrReadOnly(BasePermission):
                 or request.user.is_admin
                 or request.user.is_moderator
                 or request.user.is_superuser
-                or request.user == obj.author
+                or request.user.pk == obj.author_id
             )
         )
@@ -0,0 +1,90 @@
+import glob
+import os
+import re
+import time
+from collections import Counter
+
+UNSAFE_FILENAME = re.compile(r'[^\w.-]')
+
+
+def function_name(frame, event, arg):
+    """Имя функции в стеке: модуль:функция, для C-функций — их модуль."""
+
+    if event.startswith('c_'):
+        module = getattr(arg, '__module__', None) or 'builtins'
+        return f'{module}:{getattr(arg, "__qualname__", repr(arg))}'
+    code = frame.f_code
+    return f'{frame.f_globals.get("__name__", "?")}:{code.co_name}'
+
+
+class StackProfiler:
+    """
+    Профилировщик потока на хуке sys.setprofile (том же, что у cProfile),
+    но с полными стеками вызовов: время между событиями приписывается
+    текущему стеку. Время работы самого профилировщика не учитывается.
+    Результат — Counter {стек: секунды}, стек — кортеж имён от внешней
+    функции к внутренней.
+    """
+
+    def __init__(self):
+        self.stack = []
+        self.stacks = Counter()
+        self.last = time.perf_counter()
+
+    def __call__(self, frame, event, arg):
+        now = time.perf_counter()
+        if self.stack:
+            self.stacks[tuple(self.stack)] += now - self.last
+        if event in ('call', 'c_call'):
+            self.stack.append(function_name(frame, event, arg))
+        elif self.stack:
+            self.stack.pop()
+        self.last = time.perf_counter()
+
+
+def stack_filename(view_name):
+    return f'{UNSAFE_FILENAME.sub("_", view_name)}.folded'
+
+
+def save_stacks(directory, view_name, stacks):
+    """
+    Дописать стеки в файл представления в свёрнутом формате flamegraph:
+    'a;b;c <микросекунды>' на строку. Файл дописывается одной записью,
+    поэтому процессы могут писать в него одновременно.
+    """
+
+    lines = []
+    for stack, seconds in stacks.items():
+        microseconds = round(seconds * 1_000_000)
+        if microseconds:
+            lines.append(f'{";".join(stack)} {microseconds}\n')
+    if not lines:
+        return
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, stack_filename(view_name))
+    with open(path, 'a', encoding='utf-8') as stacks_file:
+        stacks_file.write(''.join(lines))
+
+
+def merge_stacks(paths):
+    """Сложить одинаковые стеки из нескольких свёрнутых файлов."""
+
+    merged = Counter()
+    for path in paths:
+        with open(path, encoding='utf-8') as stacks_file:
+            for line in stacks_file:
+                stack, _, weight = line.rstrip('\n').rpartition(' ')
+                if stack:
+                    merged[stack] += int(weight)
+    return merged
+
+
+def profile_paths(directory, view_names=None):
+    """Файлы стеков каталога: всех представлений или только view_names."""
+
+    if view_names:
+        return [
+            os.path.join(directory, stack_filename(view_name))
+            for view_name in view_names
+        ]
+    return sorted(glob.glob(os.path.join(directory, '*.folded')))
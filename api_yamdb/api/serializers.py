@@ -1,21 +1,26 @@
-from django.core.exceptions import ValidationError
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 from reviews.models import (
     Category,
     Comment,
-    EmailConfirmation,
     Genre,
     Review,
     Title,
     User,
 )
 
-from .utils import generate_user_confirmation_code
+from api_yamdb.const import LEN_FOR_CONF_CODE
 
+from .confirmation import get_code_store
+from .metrics import TimedRepresentationMixin
 
-class UserSerializer(serializers.ModelSerializer):
+
+class UserSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     """Сериализатор для работы c пользователями."""
 
     class Meta:
@@ -52,7 +57,11 @@ class UserSerializer(serializers.ModelSerializer):
 
 
 class SendEmailSerializer(serializers.ModelSerializer):
-    """Сериализатор для отправки кода подтверждения на почту."""
+    """
+    Сериализатор для отправки кода подтверждения на почту.
+    Уникальность username и email проверяется в create() одним запросом,
+    поэтому автоматические UniqueValidator отключены.
+    """
 
     class Meta:
         model = User
@@ -60,6 +69,10 @@ class SendEmailSerializer(serializers.ModelSerializer):
             'username',
             'email',
         )
+        extra_kwargs = {
+            'username': {'validators': [UnicodeUsernameValidator()]},
+            'email': {'validators': []},
+        }
 
     def validate_username(self, value):
         """Валидация имени пользователя."""
@@ -69,38 +82,54 @@ class SendEmailSerializer(serializers.ModelSerializer):
         return value
 
     def create(self, validated_data):
-        """Создать пользователя и присвоить ему код подтверждения."""
-
-        user = User.objects.create(**validated_data)
-        user.user_confirmation_code = generate_user_confirmation_code()
-        user.save()
-        return user
-
-
-class EmailConfirmationSerializer(serializers.ModelSerializer):
+        """Найти пользователя по username и email или создать нового."""
+
+        username = validated_data['username']
+        email = validated_data['email']
+        users = []
+        try:
+            with transaction.atomic():
+                users = list(
+                    User.objects.filter(
+                        Q(username=username) | Q(email=email)
+                    )[:2]
+                )
+                if not users:
+                    return User.objects.create(**validated_data)
+                user = users[0]
+                if len(users) == 1 and user.email == email and (
+                    user.username == username
+                ):
+                    return user
+        except IntegrityError:
+            pass
+        errors = {}
+        if not users or any(user.username == username for user in users):
+            errors['username'] = ['Пользователь с таким username уже есть!']
+        if any(user.email == email for user in users):
+            errors['email'] = ['Пользователь с таким email уже есть!']
+        raise serializers.ValidationError(errors)
+
+
+class EmailConfirmationSerializer(serializers.Serializer):
     """Сериализатор для проверки кода подтверждения пользователя."""
 
     username = serializers.CharField()
-
-    class Meta:
-        model = EmailConfirmation
-        fields = (
-            'username',
-            'confirmation_code',
-        )
+    confirmation_code = serializers.CharField(max_length=LEN_FOR_CONF_CODE)
 
     def validate(self, data):
         """Валидация кода подтверждения."""
 
-        username = data.get('username')
-        confirmation_code = data.get('confirmation_code')
-        user = get_object_or_404(User, username=username)
-        if user.user_confirmation_code != confirmation_code:
+        user = get_object_or_404(User, username=data['username'])
+        if not get_code_store().check(user, data['confirmation_code']):
             raise serializers.ValidationError('Неверный код подтверждения!')
+        data['user'] = user
         return data
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(
+    TimedRepresentationMixin, serializers.ModelSerializer
+):
     """Сериализатор категории."""
 
     class Meta:
@@ -111,7 +140,7 @@ class CategorySerializer(serializers.ModelSerializer):
         )
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     """Сериализатор жанра."""
 
     class Meta:
@@ -122,7 +151,9 @@ class GenreSerializer(serializers.ModelSerializer):
         )
 
 
-class TitleCreateSerializer(serializers.ModelSerializer):
+class TitleCreateSerializer(
+    TimedRepresentationMixin, serializers.ModelSerializer
+):
     """Серилизатор для создания произведения."""
 
     genre = serializers.SlugRelatedField(
@@ -154,14 +185,16 @@ class TitleCreateSerializer(serializers.ModelSerializer):
         return value
 
 
-class TitleReadSerializer(serializers.ModelSerializer):
+class TitleReadSerializer(
+    TimedRepresentationMixin, serializers.ModelSerializer
+):
     """Серилизатор для прочтения произведения."""
 
     genre = GenreSerializer(
         many=True,
     )
     category = CategorySerializer()
-    rating = serializers.FloatField(default=0.0)
+    rating = serializers.FloatField(read_only=True)
 
     class Meta:
         fields = (
@@ -176,9 +209,42 @@ class TitleReadSerializer(serializers.ModelSerializer):
         model = Title
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class UniqueAuthorCreateMixin:
+    """
+    Создание объекта с проверкой уникальности автора на уровне БД:
+    нарушение ограничения превращается в ответ 400. Текст IntegrityError
+    у каждой СУБД свой, поэтому после ошибки проверяется, есть ли уже
+    объект с теми же unique_fields; иначе ошибка пробрасывается дальше.
+    """
+
+    unique_error_message = None
+    unique_fields = ()
+
+    def create(self, validated_data):
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            if not self.Meta.model.objects.filter(**{
+                field: validated_data[field] for field in self.unique_fields
+            }).exists():
+                raise
+            errors = {
+                api_settings.NON_FIELD_ERRORS_KEY: [self.unique_error_message]
+            }
+            raise serializers.ValidationError(errors)
+
+
+class CommentSerializer(
+    TimedRepresentationMixin,
+    UniqueAuthorCreateMixin,
+    serializers.ModelSerializer,
+):
     """Сериализатор для комментариев."""
 
+    unique_error_message = 'Может существовать только один комментарий!'
+    unique_fields = ('review', 'author_id')
+
     author = serializers.SlugRelatedField(
         slug_field='username',
         read_only=True,
@@ -189,31 +255,21 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = ('id', 'text', 'author', 'pub_date')
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(
+    TimedRepresentationMixin,
+    UniqueAuthorCreateMixin,
+    serializers.ModelSerializer,
+):
     """Сериализатор для отзывов."""
 
+    unique_error_message = 'Может существовать только один отзыв!'
+    unique_fields = ('title', 'author_id')
+
     author = serializers.SlugRelatedField(
         slug_field='username',
         read_only=True,
     )
 
-    def validate(self, data):
-        """Проверяет валидность данных перед сохранением."""
-
-        request = self.context.get('request')
-
-        if request.method != 'POST':
-            return data
-
-        author = request.user
-        title_id = self.context.get('view').kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-
-        if Review.objects.filter(title=title, author=author).exists():
-            raise ValidationError('Может существовать только один отзыв!')
-
-        return data
-
     class Meta:
         model = Review
         fields = ('id', 'text', 'author', 'score', 'pub_date')
@@ -0,0 +1,194 @@
+import math
+import random
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Mapping
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from api_yamdb.const import THROTTLE_PURGE_PROBABILITY
+
+
+class BaseBucketStore(ABC):
+    """
+    Хранилище «вёдер» токенов. Ведро вмещает capacity токенов и
+    пополняется со скоростью rate токенов в секунду; запрос забирает
+    по токену из каждого своего ведра.
+    """
+
+    @abstractmethod
+    def consume(self, keys, capacity, rate, now=None):
+        """
+        Забрать по токену из вёдер keys. Возвращает 0, если запрос
+        пропущен, иначе — сколько секунд ждать до следующего токена.
+        """
+
+    def fill(self, buckets, keys, capacity, rate, now):
+        """
+        Пополнить вёдра по прошедшему времени и забрать токены.
+        buckets — {ключ: (токены, время)} для уже известных ключей.
+        Возвращает новое состояние вёдер или None и время ожидания.
+        """
+
+        tokens = {
+            key: min(
+                capacity,
+                buckets[key][0] + (now - buckets[key][1]) * rate
+            ) if key in buckets else capacity
+            for key in keys
+        }
+        lacking = [1 - value for value in tokens.values() if value < 1]
+        if lacking:
+            return None, max(lacking) / rate
+        return {key: (value - 1, now) for key, value in tokens.items()}, 0
+
+
+class SQLiteBucketStore(BaseBucketStore):
+    """
+    Вёдра в отдельном файле SQLite из настройки THROTTLE_DB_PATH.
+    Файл общий для всех процессов на машине, а BEGIN IMMEDIATE делает
+    проверку и списание токенов атомарными.
+    """
+
+    local = threading.local()
+
+    def get_connection(self):
+        path = str(settings.THROTTLE_DB_PATH)
+        connections = self.local.__dict__.setdefault('connections', {})
+        if path not in connections:
+            connection = sqlite3.connect(
+                path, timeout=5, isolation_level=None
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=OFF')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS bucket ('
+                'key TEXT PRIMARY KEY, tokens REAL NOT NULL, '
+                'updated REAL NOT NULL)'
+            )
+            connections[path] = connection
+        return connections[path]
+
+    def consume(self, keys, capacity, rate, now=None):
+        now = time.time() if now is None else now
+        connection = self.get_connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            placeholders = ', '.join('?' * len(keys))
+            buckets = {
+                key: (tokens, updated)
+                for key, tokens, updated in connection.execute(
+                    'SELECT key, tokens, updated FROM bucket '
+                    f'WHERE key IN ({placeholders})', keys
+                )
+            }
+            buckets, wait = self.fill(buckets, keys, capacity, rate, now)
+            if buckets:
+                connection.executemany(
+                    'INSERT OR REPLACE INTO bucket (key, tokens, updated) '
+                    'VALUES (?, ?, ?)',
+                    [(key, *bucket) for key, bucket in buckets.items()],
+                )
+            if random.random() < THROTTLE_PURGE_PROBABILITY:
+                # Полное ведро ничем не отличается от отсутствующего.
+                connection.execute(
+                    'DELETE FROM bucket WHERE updated < ?',
+                    (now - capacity / rate,),
+                )
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return wait
+
+
+class CacheBucketStore(BaseBucketStore):
+    """
+    Вёдра в кеше Django. Чтение и запись не атомарны, поэтому при
+    гонке запрос может проскочить лишний раз; годится для кешей,
+    общих для всех процессов, когда файл SQLite недоступен.
+    """
+
+    def get_key(self, key):
+        return f'throttle:{key}'
+
+    def consume(self, keys, capacity, rate, now=None):
+        now = time.time() if now is None else now
+        cached = cache.get_many([self.get_key(key) for key in keys])
+        buckets = {
+            key: cached[self.get_key(key)]
+            for key in keys if self.get_key(key) in cached
+        }
+        buckets, wait = self.fill(buckets, keys, capacity, rate, now)
+        if buckets:
+            cache.set_many(
+                {self.get_key(key): bucket for key, bucket in buckets.items()},
+                math.ceil(capacity / rate),
+            )
+        return wait
+
+
+def get_bucket_store():
+    """Хранилище вёдер из настройки THROTTLE_STORE."""
+
+    return import_string(settings.THROTTLE_STORE)()
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Ограничение частоты запросов по алгоритму token bucket.
+    Отдельные вёдра заводятся для IP-адреса и для каждого поля из
+    key_fields в теле запроса; запрос пропускается, только если токен
+    есть во всех вёдрах. Скорость берётся из DEFAULT_THROTTLE_RATES
+    по scope в формате DRF: '5/min' — ведро на 5 запросов, которое
+    пополняется на 5 токенов в минуту.
+    """
+
+    scope = None
+    key_fields = ()
+
+    def __init__(self):
+        num, period = api_settings.DEFAULT_THROTTLE_RATES[self.scope].split(
+            '/'
+        )
+        self.capacity = int(num)
+        duration = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[period[0]]
+        self.rate = self.capacity / duration
+        self.retry_after = None
+
+    def get_keys(self, request):
+        keys = [f'{self.scope}:ip:{self.get_ident(request)}']
+        if not isinstance(request.data, Mapping):
+            # Тело не объект: полей нет, ограничиваем только по IP, а
+            # ошибку формата вернёт сериализатор.
+            return keys
+        for field in self.key_fields:
+            value = request.data.get(field)
+            if isinstance(value, str) and value:
+                keys.append(f'{self.scope}:{field}:{value.casefold()}')
+        return keys
+
+    def allow_request(self, request, view):
+        self.retry_after = get_bucket_store().consume(
+            self.get_keys(request), self.capacity, self.rate
+        )
+        return not self.retry_after
+
+    def wait(self):
+        return self.retry_after
+
+
+class SignupThrottle(TokenBucketThrottle):
+    scope = 'signup'
+    key_fields = ('username', 'email')
+
+
+class TokenThrottle(TokenBucketThrottle):
+    scope = 'token'
+    key_fields = ('username',)
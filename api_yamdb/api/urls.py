@@ -4,6 +4,7 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     CategoryViewSet,
     CommentViewSet,
+    ExportData,
     GenreViewSet,
     ReviewViewSet,
     SendEmailConfirmation,
@@ -52,5 +53,9 @@ auth_urls = [
 ]
 urlpatterns = [
     path('v1/auth/', include(auth_urls)),
+    path(
+        'v1/export/<slug:table>.<slug:export_format>',
+        ExportData.as_view(),
+    ),
     path('v1/', include(router_v1.urls)),
 ]
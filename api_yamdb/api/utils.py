@@ -1,6 +1,6 @@
 from random import randint
 
-from django.core.mail import send_mail
+from reviews.mail_queue import queue_email
 
 
 def generate_user_confirmation_code():
@@ -9,13 +9,15 @@ def generate_user_confirmation_code():
     return str(randint(10000, 99999))
 
 
-def send_mail_with_confirmation_code(user):
-    """Отправить письмо на почту с кодом подтверждения."""
+def queue_mail_with_confirmation_code(user, code):
+    """
+    Поставить в очередь письмо с кодом подтверждения. Письма
+    отправляет команда send_queued_emails.
+    """
 
-    send_mail(
+    queue_email(
         subject='Код потверждения',
-        message=f'Ваш код подтверждения - {user.user_confirmation_code}',
+        message=f'Ваш код подтверждения - {code}',
         from_email='test_backend@yambd.not',
-        recipient_list=[f'{user.email}'],
-        fail_silently=True,
+        recipient=user.email,
     )
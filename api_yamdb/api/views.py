@@ -1,17 +1,26 @@
-from django.db.models import Avg
+from django.conf import settings
+from django.http import (
+    HttpResponse,
+    HttpResponseForbidden,
+    StreamingHttpResponse,
+)
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, status, viewsets
 from rest_framework.decorators import action
-from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.exceptions import NotFound
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import AccessToken
-from reviews.models import Category, Genre, Review, Title, User
+from reviews.export import EXPORT_FORMATS, EXPORT_TABLES, iter_export
+from reviews.models import Category, Comment, Genre, Review, Title, User
 
+from .confirmation import get_code_store
 from .filters import TitleFilter
-from .mixins import ModelMixinSet
+from .metrics import metrics_allowed, render_metrics
+from .mixins import CachedListMixin, CachedRetrieveMixin, ModelMixinSet
+from .pagination import LimitOffsetKeysetPagination, PubDateKeysetPagination
 from .permissions import (
     AdminModeratorAuthorOrReadOnly,
     IsAdmin,
@@ -28,10 +37,8 @@ from .serializers import (
     TitleReadSerializer,
     UserSerializer,
 )
-from .utils import (
-    generate_user_confirmation_code,
-    send_mail_with_confirmation_code,
-)
+from .throttling import SignupThrottle, TokenThrottle
+from .utils import queue_mail_with_confirmation_code
 
 
 class UserViewSet(viewsets.ModelViewSet):
@@ -44,6 +51,14 @@ class UserViewSet(viewsets.ModelViewSet):
     search_fields = ('username',)
     permission_classes = (IsAdmin,)
     http_method_names = ['get', 'post', 'patch', 'delete']
+    query_budget = {
+        'list': 3,
+        'retrieve': 2,
+        'create': 4,
+        'partial_update': 3,
+        'destroy': 13,
+        'self_information': 4,
+    }
 
     @action(
         detail=False,
@@ -58,10 +73,11 @@ class UserViewSet(viewsets.ModelViewSet):
         сделавшего PATCH-запрос.
         """
 
-        serializer = self.get_serializer(request.user)
+        user = get_object_or_404(User, pk=request.user.pk)
+        serializer = self.get_serializer(user)
         if request.method == 'PATCH':
             serializer = self.get_serializer(
-                request.user, data=request.data, partial=True
+                user, data=request.data, partial=True
             )
             if serializer.is_valid():
                 serializer.save()
@@ -76,6 +92,8 @@ class SendEmailConfirmation(APIView):
     """Вьюсет для отправки кода подтверждения на почту."""
 
     permission_classes = [AllowAny]
+    throttle_classes = [SignupThrottle]
+    query_budget = 9
 
     def post(self, request, format=None):
         """
@@ -84,25 +102,10 @@ class SendEmailConfirmation(APIView):
         """
 
         serializer = SendEmailSerializer(data=request.data)
-        username = request.data.get('username')
-        email = request.data.get('email')
-        if username in User.objects.values_list('username', flat=True):
-            user = get_object_or_404(User, username=username)
-            if user.email != email:
-                if not serializer.is_valid():
-                    return Response(
-                        serializer.errors, status=status.HTTP_400_BAD_REQUEST
-                    )
-            user.user_confirmation_code = generate_user_confirmation_code()
-            user.save()
-            send_mail_with_confirmation_code(user)
-            return Response(request.data, status=status.HTTP_200_OK)
         if serializer.is_valid():
-            serializer.save()
-            user = get_object_or_404(
-                User, username=serializer.validated_data.get('username')
-            )
-            send_mail_with_confirmation_code(user)
+            user = serializer.save()
+            code = get_code_store().issue(user)
+            queue_mail_with_confirmation_code(user, code)
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -114,14 +117,14 @@ class SendToken(APIView):
     """
 
     permission_classes = [AllowAny]
+    throttle_classes = [TokenThrottle]
+    query_budget = 3
 
     def post(self, request, format=None):
         """Получить токен авторизации."""
         serializer = EmailConfirmationSerializer(data=request.data)
         if serializer.is_valid():
-            username = serializer.validated_data.get('username')
-            user = get_object_or_404(User, username=username)
-            token = AccessToken.for_user(user)
+            token = AccessToken.for_user(serializer.validated_data['user'])
             return Response({'token': str(token)}, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -131,6 +134,7 @@ class CategoryViewSet(ModelMixinSet):
 
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    cache_groups = ('categories',)
 
 
 class GenreViewSet(ModelMixinSet):
@@ -138,17 +142,30 @@ class GenreViewSet(ModelMixinSet):
 
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    cache_groups = ('genres',)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(
+    CachedListMixin, CachedRetrieveMixin, viewsets.ModelViewSet
+):
     """Вьюсет для работы с произведениями."""
 
-    queryset = Title.objects.all().annotate(rating=Avg('reviews__score'))
+    queryset = Title.objects.select_related('category').prefetch_related(
+        'genre'
+    )
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
     http_method_names = ['get', 'post', 'patch', 'delete']
-    pagination_class = LimitOffsetPagination
+    pagination_class = LimitOffsetKeysetPagination
+    cache_groups = ('titles',)
+    query_budget = {
+        'list': 3,
+        'retrieve': 2,
+        'create': 10,
+        'partial_update': 5,
+        'destroy': 8,
+    }
 
     def get_serializer_class(self):
         """Возвращает класс сериализатора в зависимости от действия."""
@@ -164,49 +181,125 @@ class CommentViewSet(viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = (AdminModeratorAuthorOrReadOnly,)
     http_method_names = ['get', 'post', 'patch', 'delete']
+    pagination_class = PubDateKeysetPagination
+    query_budget = {
+        'list': 3,
+        'retrieve': 1,
+        'create': 4,
+        'partial_update': 2,
+        'destroy': 2,
+    }
 
     def get_review(self):
-        """Получает объект класса Review."""
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        return get_object_or_404(
-            Review, pk=self.kwargs.get('review_id'), title=title
-        )
+        """
+        Получает объект класса Review вместе с произведением
+        одним запросом и запоминает его до конца запроса.
+        """
+
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review.objects.select_related('title'),
+                pk=self.kwargs.get('review_id'),
+                title_id=self.kwargs.get('title_id'),
+            )
+        return self._review
 
     def get_queryset(self):
         """Получает и возвращает список комментариев для конкретного отзыва."""
 
+        if self.detail:
+            return Comment.objects.select_related('author').filter(
+                review_id=self.kwargs.get('review_id'),
+                review__title_id=self.kwargs.get('title_id'),
+            )
         review = self.get_review()
-        return review.comments.all()
+        return review.comments.select_related('author')
 
     def perform_create(self, serializer):
         """Создает новый комментарий для отзыва."""
 
-        author = self.request.user
         review = self.get_review()
-        serializer.save(author=author, review=review)
+        serializer.save(author_id=self.request.user.pk, review=review)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(
+    CachedListMixin, CachedRetrieveMixin, viewsets.ModelViewSet
+):
     """Вьюсет для работы с отзывами."""
 
     serializer_class = ReviewSerializer
     permission_classes = (AdminModeratorAuthorOrReadOnly,)
     http_method_names = ['get', 'post', 'patch', 'delete']
-    pagination_class = LimitOffsetPagination
+    pagination_class = PubDateKeysetPagination
+    cache_groups = ('reviews', 'reviews:{title_id}')
+    query_budget = {
+        'list': 3,
+        'retrieve': 1,
+        'create': 6,
+        'partial_update': 3,
+        'destroy': 5,
+    }
 
     def get_title(self):
-        """Получает объект класса Title."""
-        return get_object_or_404(Title, pk=self.kwargs.get('title_id'))
+        """Получает объект класса Title и запоминает его до конца запроса."""
+
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title, pk=self.kwargs.get('title_id')
+            )
+        return self._title
 
     def get_queryset(self):
         """Получает и возвращает список отзывов для конкретного заголовка."""
 
+        if self.detail:
+            return Review.objects.select_related('author').filter(
+                title_id=self.kwargs.get('title_id')
+            )
         title = self.get_title()
-        return title.reviews.all()
+        return title.reviews.select_related('author')
 
     def perform_create(self, serializer):
         """Создает новый отзыв или обновляет существующий."""
 
         title = self.get_title()
-        author = self.request.user
-        serializer.save(author=author, title=title)
+        serializer.save(author_id=self.request.user.pk, title=title)
+
+
+class ExportData(APIView):
+    """
+    Потоковая выгрузка таблицы в csv или NDJSON для администратора:
+    /export/review.csv, /export/titles.ndjson и т.д.
+    """
+
+    permission_classes = (IsAdmin,)
+    content_types = {
+        'csv': 'text/csv; charset=utf-8',
+        'ndjson': 'application/x-ndjson; charset=utf-8',
+    }
+
+    def get(self, request, table, export_format):
+        if table not in EXPORT_TABLES or export_format not in EXPORT_FORMATS:
+            raise NotFound('Нет такой выгрузки.')
+        response = StreamingHttpResponse(
+            iter_export(EXPORT_TABLES[table], export_format),
+            content_type=self.content_types[export_format],
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{table}.{export_format}"'
+        )
+        return response
+
+
+def prometheus_metrics(request):
+    """
+    Метрики всех процессов в текстовом формате Prometheus. Доступны
+    только по токену METRICS_TOKEN или адресам METRICS_ALLOWED_IPS.
+    """
+
+    if not metrics_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        render_metrics(settings.METRICS_DIR),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
@@ -1,6 +1,36 @@
 LEN_FOR_CONF_CODE = 5
+LEN_FOR_CODE_HASH = 64
 LEN_FOR_SLUG = 50
 LEN_FOR_NAME = 256
 LEN_FOR_ROLE = 15
+LEN_FOR_STATUS = 10
 MIN_REVIEW_SCORE = 1
 MAX_REVIEW_SCORE = 10
+MAX_PAGE_SIZE = 100
+AUTH_USER_CACHE_TIMEOUT = 300
+EMAIL_QUEUE_BATCH_SIZE = 100
+EMAIL_MAX_ATTEMPTS = 5
+EMAIL_RETRY_DELAY = 60
+EMAIL_LEASE_TIMEOUT = 300
+CONFIRMATION_CODE_TTL = 60 * 60
+THROTTLE_PURGE_PROBABILITY = 0.01
+CSV_IMPORT_BATCH_SIZE = 5000
+EXPORT_CHUNK_SIZE = 2000
+BENCHMARK_LATENCY_THRESHOLD = 0.5
+BENCHMARK_LATENCY_FLOOR_MS = 2.0
+BENCHMARK_QUERIES_THRESHOLD = 0
+BENCHMARK_MEMORY_THRESHOLD = 0.5
+QUERY_REPEAT_LIMIT = 3
+METRICS_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+METRICS_FILE_SIZE = 64 * 1024
+PROFILER_HEADER = 'HTTP_X_PROFILE'
+RESPONSE_CACHE_TIMEOUT = 5 * 60
+RESPONSE_CACHE_STALE_TIMEOUT = 60
+RESPONSE_CACHE_EARLY_BETA = 1.0
+RESPONSE_CACHE_LOCK_TIMEOUT = 10
+RESPONSE_CACHE_LOCK_WAIT = 1.0
+RESPONSE_CACHE_POLL_INTERVAL = 0.005
+RESPONSE_CACHE_PURGE_PROBABILITY = 0.01
+EMAIL_RETENTION = 24 * 60 * 60
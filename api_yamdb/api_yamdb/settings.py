@@ -24,6 +24,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.ProfilerMiddleware',
+    'api.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -31,6 +33,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.QueryInspectorMiddleware',
 ]
 
 ROOT_URLCONF = 'api_yamdb.urls'
@@ -98,7 +101,7 @@ STATICFILES_DIRS = ((BASE_DIR / 'static/'),)
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedUserJWTAuthentication',
     ],
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend'
@@ -107,9 +110,13 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_PAGINATION_CLASS': (
-        'rest_framework.pagination.LimitOffsetPagination'
+        'api.pagination.LimitOffsetKeysetPagination'
     ),
     'PAGE_SIZE': 10,
+    'DEFAULT_THROTTLE_RATES': {
+        'signup': '5/min',
+        'token': '5/min',
+    },
 }
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
@@ -123,4 +130,38 @@ SIMPLE_JWT = {
 
 AUTH_USER_MODEL = 'reviews.User'
 
+CONFIRMATION_CODE_STORE = 'api.confirmation.DatabaseCodeStore'
+
+THROTTLE_STORE = 'api.throttling.SQLiteBucketStore'
+
+THROTTLE_DB_PATH = BASE_DIR / 'throttle.sqlite3'
+
+RESPONSE_CACHE_ENABLED = True
+
+RESPONSE_CACHE_STORE = 'api.caching.SQLiteResponseStore'
+
+RESPONSE_CACHE_DB_PATH = BASE_DIR / 'response_cache.sqlite3'
+
+RESPONSE_CACHE_LOCK = 'api.caching.StoreLock'
+
+RESPONSE_CACHE_SINGLE_FLIGHT = True
+
+AUTH_USER_CACHE_STORE = 'api.caching.SQLiteResponseStore'
+
+QUERY_INSPECTOR_RAISE = False
+
+METRICS_DIR = BASE_DIR / 'metrics'
+
+# За прокси на той же машине REMOTE_ADDR всех запросов — 127.0.0.1,
+# поэтому по умолчанию метрики доступны только по METRICS_TOKEN.
+METRICS_ALLOWED_IPS = ()
+
+METRICS_TOKEN = None
+
+PROFILER_ENABLED = False
+
+PROFILER_SAMPLE_RATE = 0.0
+
+PROFILER_DIR = BASE_DIR / 'profiles'
+
 EMAIL_BACKEND = 'django.core.mail.backends.dummy.EmailBackend'
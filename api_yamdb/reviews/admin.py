@@ -1,6 +1,14 @@
 from django.contrib import admin
 
-from .models import Category, Comment, Genre, Review, Title, User
+from .models import (
+    Category,
+    Comment,
+    Genre,
+    QueuedEmail,
+    Review,
+    Title,
+    User,
+)
 
 
 class UserAdmin(admin.ModelAdmin):
@@ -69,9 +77,26 @@ class CommentAdmin(admin.ModelAdmin):
     list_filter = ('author', 'review', 'pub_date')
 
 
+class QueuedEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        'id',
+        'recipient',
+        'subject',
+        'status',
+        'attempts',
+        'send_after',
+        'sent_at',
+    )
+    search_fields = ('recipient',)
+    list_filter = ('status',)
+    # В тексте письма код подтверждения.
+    exclude = ('message',)
+
+
 admin.site.register(User, UserAdmin)
 admin.site.register(Category, CategoryAdmin)
 admin.site.register(Genre, GenreAdmin)
 admin.site.register(Title, TitleAdmin)
 admin.site.register(Review, ReviewAdmin)
 admin.site.register(Comment, CommentAdmin)
+admin.site.register(QueuedEmail, QueuedEmailAdmin)
@@ -0,0 +1,275 @@
+import csv
+from collections import Counter
+from itertools import islice
+
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.utils import timezone
+
+from api_yamdb.const import CSV_IMPORT_BATCH_SIZE
+from .models import Category, Comment, Genre, Review, Title, User
+
+CSV_FILES = (
+    (User, 'users.csv'),
+    (Category, 'category.csv'),
+    (Genre, 'genre.csv'),
+    (Title, 'titles.csv'),
+    (Title.genre.through, 'genre_title.csv'),
+    (Review, 'review.csv'),
+    (Comment, 'comments.csv'),
+)
+
+# По каким столбцам строка файла сопоставляется с записью в БД при
+# повторной загрузке. Для остальных таблиц — по первичному ключу.
+UPSERT_KEYS = {
+    Category: ('slug',),
+    Genre: ('slug',),
+    Title.genre.through: ('title_id', 'genre_id'),
+}
+
+
+def read_batches(rows, batch_size):
+    """Разбить поток строк на списки по batch_size, не читая его целиком."""
+
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _missing_value(field):
+    """Значение поля, которого нет в файле, как при создании объекта."""
+
+    if getattr(field, 'auto_now', False) or getattr(
+        field, 'auto_now_add', False
+    ):
+        return timezone.now()
+    return field.get_default()
+
+
+def _quote(name):
+    return connection.ops.quote_name(name)
+
+
+def insert_rows(model, fields, rows, skip_pk=False):
+    """
+    Вставить строки значений полей fields в таблицу модели одним
+    executemany. Поля, которых нет в fields, получают значения по
+    умолчанию; с skip_pk первичный ключ назначает БД.
+    """
+
+    if not rows:
+        return
+    opts = model._meta
+    # Прокси django.db.connection дорог на миллионах обращений.
+    db = connections[DEFAULT_DB_ALIAS]
+    columns = [
+        index for index, field in enumerate(fields)
+        if not (skip_pk and field.primary_key)
+    ]
+    missing = [
+        field for field in opts.concrete_fields
+        if field not in fields and not field.primary_key
+    ]
+    defaults = [
+        field.get_db_prep_save(_missing_value(field), db)
+        for field in missing
+    ]
+    names = ', '.join(
+        _quote(field.column)
+        for field in [fields[index] for index in columns] + missing
+    )
+    placeholders = ', '.join(['%s'] * (len(columns) + len(missing)))
+    preps = [
+        (index, fields[index].get_db_prep_save) for index in columns
+    ]
+    with db.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {_quote(opts.db_table)} ({names}) '
+            f'VALUES ({placeholders})',
+            [
+                [prep(values[index], db) for index, prep in preps]
+                + defaults
+                for values in rows
+            ],
+        )
+
+
+class CsvImport:
+    """
+    Загрузка csv файлов в таблицы моделей. Файлы читаются потоком и
+    пишутся пачками по batch_size строк через executemany, минуя
+    модели, сигналы и auto_now_add: даты из файла сохраняются как есть.
+    Столбцы с внешними ключами (author, category) пишутся в *_id.
+
+    В режиме upsert строка файла сравнивается с записью, найденной по
+    UPSERT_KEYS: совпадающие записи пропускаются, отличающиеся (в том
+    числе изменённые в БД после прошлой загрузки) обновляются, а
+    ненайденные добавляются. Категории и жанры
+    ищутся по слагу, и id из файла заменяются на id из БД во всех
+    ссылках на них. Строки, которых нет в файле, не удаляются.
+    """
+
+    def __init__(self, batch_size=CSV_IMPORT_BATCH_SIZE, upsert=False):
+        self.batch_size = batch_size
+        self.upsert = upsert
+        self.id_maps = {}
+        self.changed_titles = set()
+
+    def to_python(self, field, value):
+        if value == '' and field.null:
+            return None
+        value = field.to_python(value)
+        id_map = self.id_maps.get(field.related_model)
+        return value if id_map is None else id_map.get(value, value)
+
+    def load_file(self, model, path, progress=None):
+        """
+        Загрузить файл в таблицу модели. Возвращает Counter с числом
+        добавленных (inserted), обновлённых (updated) и неизменных
+        (unchanged) строк; progress, если передан, вызывается с числом
+        обработанных строк после каждой пачки.
+        """
+
+        opts = model._meta
+        counts = Counter()
+        with open(path, encoding='utf-8', newline='') as csv_file:
+            reader = csv.reader(csv_file)
+            fields = [opts.get_field(name) for name in next(reader)]
+            key_fields = [
+                opts.get_field(name)
+                for name in UPSERT_KEYS.get(model, (opts.pk.attname,))
+            ]
+            if (
+                self.upsert
+                and opts.pk not in key_fields
+                and opts.pk in fields
+            ):
+                self.id_maps[model] = {}
+            for batch in read_batches(reader, self.batch_size):
+                counts.update(
+                    self.load_batch(model, fields, key_fields, batch)
+                )
+                if progress:
+                    progress(sum(counts.values()))
+        return counts
+
+    def find_existing(self, model, key_fields, keys, extra=()):
+        """Записи модели с ключами keys: {ключ: (pk, *extra)}."""
+
+        if not keys:
+            return {}
+        size = len(key_fields)
+        found = model.objects.filter(**{
+            f'{field.attname}__in': {key[index] for key in keys}
+            for index, field in enumerate(key_fields)
+        }).order_by().values_list(
+            *[field.attname for field in key_fields], 'pk', *extra
+        )
+        keys = set(keys)
+        return {
+            row[:size]: row[size:] for row in found if row[:size] in keys
+        }
+
+    def load_batch(self, model, fields, key_fields, batch):
+        rows = {}
+        for raw in batch:
+            values = [self.to_python(field, value)
+                      for field, value in zip(fields, raw)]
+            key = tuple(values[fields.index(field)] for field in key_fields)
+            rows[key] = values
+
+        columns = self.update_columns(fields, key_fields)
+        existing = {}
+        if self.upsert:
+            extra = [fields[index].attname for index in columns]
+            if model is Review:
+                extra.append('title_id')
+            existing = self.find_existing(model, key_fields, list(rows), extra)
+
+        inserts, updates = [], []
+        for key, values in rows.items():
+            if key not in existing:
+                inserts.append(values)
+            elif existing[key][1:len(columns) + 1] != tuple(
+                values[index] for index in columns
+            ):
+                updates.append(values)
+                if model is Review:
+                    # Отзыв мог перейти к другому произведению.
+                    self.changed_titles.add(existing[key][-1])
+        # Для моделей с id_map первичный ключ назначает БД.
+        insert_rows(model, fields, inserts, skip_pk=model in self.id_maps)
+        updated = self.update(model, fields, key_fields, updates)
+
+        if model is Review:
+            title_index = fields.index(model._meta.get_field('title'))
+            self.changed_titles.update(
+                values[title_index] for values in inserts + updates
+            )
+        if model in self.id_maps:
+            pk_index = fields.index(model._meta.pk)
+            found = self.find_existing(model, key_fields, list(rows))
+            self.id_maps[model].update(
+                (values[pk_index], found[key][0])
+                for key, values in rows.items()
+            )
+        return Counter(
+            inserted=len(inserts),
+            updated=updated,
+            unchanged=len(rows) - len(inserts) - updated,
+        )
+
+    def update_columns(self, fields, key_fields):
+        """Индексы полей, которые обновляются у найденной записи."""
+
+        return [
+            index for index, field in enumerate(fields)
+            if field not in key_fields and not field.primary_key
+        ]
+
+    def update(self, model, fields, key_fields, rows):
+        """
+        Обновить записи, найденные по key_fields, значениями из файла.
+        Возвращает количество обновлённых строк.
+        """
+
+        columns = self.update_columns(fields, key_fields)
+        if not rows or not columns:
+            return 0
+        keys = [fields.index(field) for field in key_fields]
+        assignments = ', '.join(
+            f'{_quote(fields[index].column)} = %s' for index in columns
+        )
+        conditions = ' AND '.join(
+            f'{_quote(field.column)} = %s' for field in key_fields
+        )
+        db = connections[DEFAULT_DB_ALIAS]
+        preps = [
+            (index, fields[index].get_db_prep_save)
+            for index in columns + keys
+        ]
+        with db.cursor() as cursor:
+            cursor.executemany(
+                f'UPDATE {_quote(model._meta.db_table)} '
+                f'SET {assignments} WHERE {conditions}',
+                [
+                    [prep(values[index], db) for index, prep in preps]
+                    for values in rows
+                ],
+            )
+        return len(rows)
+
+
+def reset_sequences(models):
+    """
+    Сдвинуть последовательности первичных ключей за загруженные id,
+    иначе следующая вставка через ORM столкнётся с ними (PostgreSQL).
+    """
+
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
@@ -0,0 +1,93 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+from api_yamdb.const import EXPORT_CHUNK_SIZE
+from .csv_import import CSV_FILES, read_batches
+from .models import Category, Comment, Genre, Review, Title, User
+
+# Столбцы в том же порядке, что и в static/data. У произведений в конце
+# добавлено описание, чтобы выгрузка загружалась обратно без потерь.
+EXPORT_COLUMNS = {
+    User: (
+        'id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name'
+    ),
+    Category: ('id', 'name', 'slug'),
+    Genre: ('id', 'name', 'slug'),
+    Title: ('id', 'name', 'year', 'category', 'description'),
+    Title.genre.through: ('id', 'title_id', 'genre_id'),
+    Review: ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+    Comment: ('id', 'review_id', 'text', 'author', 'pub_date'),
+}
+
+EXPORT_FORMATS = ('csv', 'ndjson')
+
+# Имя файла выгрузки без расширения -> модель.
+EXPORT_TABLES = {
+    name.rsplit('.', 1)[0]: model for model, name in CSV_FILES
+}
+
+
+def _to_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat().replace('+00:00', 'Z')
+    return value
+
+
+def export_rows(model, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Строки таблицы модели в порядке первичного ключа. Записи читаются
+    через iterator(chunk_size), без кеша QuerySet, поэтому память не
+    растёт вместе с таблицей.
+    """
+
+    attnames = [
+        model._meta.get_field(column).attname
+        for column in EXPORT_COLUMNS[model]
+    ]
+    return (
+        model.objects.order_by('pk')
+        .values_list(*attnames)
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def iter_csv(model, chunk_size=EXPORT_CHUNK_SIZE):
+    """Выгрузка таблицы в csv: заголовок и затем по куску на пачку строк."""
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(EXPORT_COLUMNS[model])
+    for batch in read_batches(export_rows(model, chunk_size), chunk_size):
+        writer.writerows(
+            [_to_text(value) for value in row] for row in batch
+        )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_ndjson(model, chunk_size=EXPORT_CHUNK_SIZE):
+    """Выгрузка таблицы в NDJSON: по объекту на строку."""
+
+    columns = EXPORT_COLUMNS[model]
+    for batch in read_batches(export_rows(model, chunk_size), chunk_size):
+        yield ''.join(
+            json.dumps(
+                dict(zip(columns, row)), ensure_ascii=False,
+                default=_to_text,
+            ) + '\n'
+            for row in batch
+        )
+
+
+def iter_export(model, export_format, chunk_size=EXPORT_CHUNK_SIZE):
+    """Куски выгрузки таблицы в формате export_format."""
+
+    if export_format == 'csv':
+        return iter_csv(model, chunk_size)
+    return iter_ndjson(model, chunk_size)
@@ -0,0 +1,145 @@
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from api_yamdb.const import (
+    EMAIL_LEASE_TIMEOUT,
+    EMAIL_MAX_ATTEMPTS,
+    EMAIL_QUEUE_BATCH_SIZE,
+    EMAIL_RETENTION,
+    EMAIL_RETRY_DELAY,
+)
+from .models import QueuedEmail
+
+
+def queue_email(subject, message, from_email, recipient):
+    """Поставить письмо в очередь на отправку."""
+
+    return QueuedEmail.objects.create(
+        subject=subject,
+        message=message,
+        from_email=from_email,
+        recipient=recipient,
+    )
+
+
+def lease(batch, until):
+    """
+    Отложить прочитанные письма до until и вернуть те, что удалось
+    забрать. Письмо забирается, только если его send_after не изменился
+    с чтения: иначе его уже забрал другой воркер.
+    """
+
+    claimed = []
+    for email in batch:
+        if QueuedEmail.objects.filter(
+            pk=email.pk, send_after=email.send_after
+        ).update(send_after=until):
+            email.send_after = until
+            claimed.append(email)
+    return claimed
+
+
+def claim_batch(batch_size=EMAIL_QUEUE_BATCH_SIZE):
+    """
+    Забрать пачку готовых к отправке писем. Письма откладываются на
+    EMAIL_LEASE_TIMEOUT, чтобы параллельный воркер их не взял; если
+    воркер упадёт, письма вернутся в очередь по истечении этого срока.
+    Без SELECT ... SKIP LOCKED (SQLite) два воркера могут прочитать одни
+    и те же письма, поэтому каждое забирается условным UPDATE.
+    """
+
+    now = timezone.now()
+    until = now + timedelta(seconds=EMAIL_LEASE_TIMEOUT)
+    with transaction.atomic():
+        pending = QueuedEmail.objects.filter(
+            status='pending', send_after__lte=now
+        ).order_by('send_after', 'id')
+        if not connection.features.has_select_for_update_skip_locked:
+            return lease(pending[:batch_size], until)
+        batch = list(
+            pending.select_for_update(skip_locked=True)[:batch_size]
+        )
+        QueuedEmail.objects.filter(
+            pk__in=[email.pk for email in batch]
+        ).update(send_after=until)
+    return batch
+
+
+def describe_error(error):
+    """Текст ошибки отправки для last_error."""
+
+    return f'{type(error).__name__}: {error}'
+
+
+def deliver_batch(batch, max_attempts=EMAIL_MAX_ATTEMPTS):
+    """
+    Отправить письма через одно соединение с почтовым сервером. Если
+    соединиться не удалось, попытка считается неудачной для всей пачки.
+    Текст отправленных и окончательно неотправленных писем стирается:
+    в нём код подтверждения. Возвращает количество отправленных и
+    неудачных писем.
+    """
+
+    sent, failed = [], []
+    mail_connection = get_connection(fail_silently=False)
+    try:
+        mail_connection.open()
+    except Exception as error:
+        for email in batch:
+            email.last_error = describe_error(error)
+        failed = list(batch)
+    else:
+        try:
+            for email in batch:
+                message = EmailMessage(
+                    subject=email.subject,
+                    body=email.message,
+                    from_email=email.from_email,
+                    to=[email.recipient],
+                    connection=mail_connection,
+                )
+                try:
+                    mail_connection.send_messages([message])
+                except Exception as error:
+                    email.last_error = describe_error(error)
+                    failed.append(email)
+                else:
+                    sent.append(email.pk)
+        finally:
+            mail_connection.close()
+
+    now = timezone.now()
+    QueuedEmail.objects.filter(pk__in=sent).update(
+        status='sent', sent_at=now, attempts=F('attempts') + 1,
+        message='',
+    )
+    for email in failed:
+        email.attempts += 1
+        if email.attempts >= max_attempts:
+            email.status = 'failed'
+            email.message = ''
+        email.send_after = now + timedelta(
+            seconds=EMAIL_RETRY_DELAY * 2 ** (email.attempts - 1)
+        )
+    QueuedEmail.objects.bulk_update(
+        failed,
+        ['attempts', 'status', 'send_after', 'last_error', 'message'],
+    )
+    return len(sent), len(failed)
+
+
+def purge_finished():
+    """
+    Удалить отправленные и неотправленные письма старше EMAIL_RETENTION
+    секунд. Возвращает количество удалённых.
+    """
+
+    deleted, _ = QueuedEmail.objects.filter(
+        status__in=('sent', 'failed'),
+        created__lt=timezone.now() - timedelta(seconds=EMAIL_RETENTION),
+    ).delete()
+    return deleted
@@ -0,0 +1,45 @@
+from pathlib import Path
+
+from django.core.management import BaseCommand
+
+from api_yamdb.const import EXPORT_CHUNK_SIZE
+from reviews.csv_import import CSV_FILES
+from reviews.export import EXPORT_FORMATS, iter_export
+
+
+class Command(BaseCommand):
+    """Выгружает таблицы в файлы того же вида, что и static/data."""
+
+    help = 'Выгрузить данные в csv или NDJSON файлы.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            type=Path,
+            help='Директория, куда записать файлы.',
+        )
+        parser.add_argument(
+            '--format',
+            choices=EXPORT_FORMATS,
+            default='csv',
+            help='Формат файлов.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=EXPORT_CHUNK_SIZE,
+            help='Сколько строк читать из БД за раз.',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        path.mkdir(parents=True, exist_ok=True)
+        for model, name in CSV_FILES:
+            name = f'{name.rsplit(".", 1)[0]}.{options["format"]}'
+            with open(path / name, 'w', encoding='utf-8') as export_file:
+                for chunk in iter_export(
+                    model, options['format'], options['chunk_size']
+                ):
+                    export_file.write(chunk)
+            self.stdout.write(f'{name}: записан')
+        self.stdout.write(self.style.SUCCESS(f'Данные выгружены в {path}'))
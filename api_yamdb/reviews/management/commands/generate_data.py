@@ -0,0 +1,74 @@
+import time
+
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from api.caching import bump_all_versions
+from api_yamdb.const import CSV_IMPORT_BATCH_SIZE
+from reviews.csv_import import reset_sequences
+from reviews.ratings import recalculate_ratings
+from reviews.synthetic import DatasetGenerator
+
+
+class Command(BaseCommand):
+    """Наполняет БД синтетическими данными для нагрузочных тестов."""
+
+    help = 'Сгенерировать пользователей, произведения, отзывы и комментарии.'
+
+    def add_arguments(self, parser):
+        for name, default in (
+            ('users', 1000),
+            ('categories', 10),
+            ('genres', 24),
+            ('titles', 500),
+            ('reviews', 20000),
+            ('comments', 50000),
+        ):
+            parser.add_argument(
+                f'--{name}',
+                type=int,
+                default=default,
+                help=f'Сколько создать: {name}.',
+            )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Зерно генератора: одинаковое зерно — одинаковые данные.',
+        )
+        parser.add_argument(
+            '--zipf',
+            type=float,
+            default=1.1,
+            help='Показатель закона Ципфа для числа отзывов на произведение.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=CSV_IMPORT_BATCH_SIZE,
+            help='Сколько строк вставлять за один запрос.',
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        generator = DatasetGenerator(
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            zipf_exponent=options['zipf'],
+            progress=lambda model, count: self.stdout.write(
+                f'{model._meta.verbose_name_plural}: {count}', ending='\r'
+            ),
+        )
+        with transaction.atomic():
+            written = generator.generate(
+                options['users'], options['categories'], options['genres'],
+                options['titles'], options['reviews'], options['comments'],
+            )
+            reset_sequences(list(written))
+            recalculate_ratings()
+            bump_all_versions()
+        for model, count in written.items():
+            self.stdout.write(f'{model._meta.verbose_name_plural}: {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Данные сгенерированы за {time.monotonic() - started:.1f} с'
+        ))
@@ -0,0 +1,82 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+
+from api.caching import bump_all_versions
+from api_yamdb.const import CSV_IMPORT_BATCH_SIZE
+from reviews.csv_import import CSV_FILES, CsvImport, reset_sequences
+from reviews.models import Title
+from reviews.ratings import recalculate_ratings
+
+
+class Command(BaseCommand):
+    """Заполняет БД данными из csv файлов в одной транзакции."""
+
+    help = 'Загрузить данные из csv файлов static/data.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            type=Path,
+            default=Path(settings.BASE_DIR) / 'static' / 'data',
+            help='Директория с csv файлами.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=CSV_IMPORT_BATCH_SIZE,
+            help='Сколько строк вставлять за один запрос.',
+        )
+        parser.add_argument(
+            '--upsert',
+            action='store_true',
+            help=(
+                'Повторная загрузка: обновить строки, отличающиеся от '
+                'записей в БД, и пропустить совпадающие.'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        missing = [
+            name for _, name in CSV_FILES if not (path / name).is_file()
+        ]
+        if missing:
+            raise CommandError(
+                f'В {path} не найдены файлы: {", ".join(missing)}'
+            )
+        csv_import = CsvImport(options['batch_size'], options['upsert'])
+        with transaction.atomic():
+            for model, name in CSV_FILES:
+                counts = csv_import.load_file(
+                    model,
+                    path / name,
+                    progress=lambda count, name=name: self.stdout.write(
+                        f'{name}: {count} строк', ending='\r'
+                    ),
+                )
+                self.stdout.write(
+                    f'{name}: добавлено {counts["inserted"]}, обновлено '
+                    f'{counts["updated"]}, без изменений '
+                    f'{counts["unchanged"]}'
+                )
+            reset_sequences([model for model, _ in CSV_FILES])
+            self.update_ratings(csv_import)
+            bump_all_versions()
+        self.stdout.write(self.style.SUCCESS('Все данные загружены'))
+
+    def update_ratings(self, csv_import):
+        """Пересчитать рейтинг произведений, у которых менялись отзывы."""
+
+        if not csv_import.upsert:
+            recalculate_ratings()
+            return
+        title_ids = sorted(csv_import.changed_titles)
+        batch_size = csv_import.batch_size
+        for start in range(0, len(title_ids), batch_size):
+            recalculate_ratings(Title.objects.filter(
+                pk__in=title_ids[start:start + batch_size]
+            ))
+        self.stdout.write(f'Пересчитан рейтинг {len(title_ids)} произведений')
@@ -0,0 +1,41 @@
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+
+from api.caching import bump_version
+from reviews.ratings import find_rating_mismatches, recalculate_ratings
+
+
+class Command(BaseCommand):
+    """Пересчитывает или проверяет сохранённые рейтинги произведений."""
+
+    help = 'Пересчитать rating_sum/rating_count произведений по отзывам.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить рейтинги, ничего не изменяя.',
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            mismatches = find_rating_mismatches()
+            for title in mismatches:
+                self.stdout.write(
+                    f'{title.pk}: сохранено {title.rating_sum}/'
+                    f'{title.rating_count}, по отзывам '
+                    f'{title.actual_sum}/{title.actual_count}'
+                )
+            if mismatches:
+                raise CommandError(
+                    f'Рейтинг расходится у {len(mismatches)} произведений.'
+                )
+            self.stdout.write(self.style.SUCCESS('Все рейтинги корректны'))
+            return
+        with transaction.atomic():
+            updated = recalculate_ratings()
+            # QuerySet.update() не отправляет сигналы, сбрасывающие кеш.
+            bump_version('titles')
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитан рейтинг {updated} произведений')
+        )
@@ -0,0 +1,70 @@
+import time
+
+from django.core.management import BaseCommand
+
+from api_yamdb.const import EMAIL_MAX_ATTEMPTS, EMAIL_QUEUE_BATCH_SIZE
+from reviews.mail_queue import claim_batch, deliver_batch, purge_finished
+
+
+class Command(BaseCommand):
+    """
+    Отправляет письма из очереди пачками через одно соединение. Когда
+    очередь пуста, удаляет давно отправленные и неотправленные письма.
+    """
+
+    help = 'Отправить письма из очереди QueuedEmail.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=EMAIL_QUEUE_BATCH_SIZE,
+            help='Сколько писем отправлять через одно соединение.',
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=EMAIL_MAX_ATTEMPTS,
+            help='После скольких неудач письмо считается неотправленным.',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, а ждать новые письма.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help='Пауза в секундах, когда очередь пуста (с --loop).',
+        )
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        started = time.monotonic()
+        while True:
+            batch = claim_batch(options['batch_size'])
+            if batch:
+                sent, failed = deliver_batch(batch, options['max_attempts'])
+                total_sent += sent
+                total_failed += failed
+                self.report(sent, failed, time.monotonic() - started)
+                continue
+            purge_finished()
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово: отправлено {total_sent}, ошибок {total_failed}, '
+            f'{elapsed:.2f} с'
+        ))
+
+    def report(self, sent, failed, elapsed):
+        """Вывести метрики по отправленной пачке."""
+
+        rate = sent / elapsed if elapsed else 0
+        self.stdout.write(
+            f'Пачка: отправлено {sent}, ошибок {failed}; '
+            f'{rate:.1f} писем/с с начала работы'
+        )
@@ -0,0 +1,39 @@
+# Generated by Django 3.2 on 2026-10-18 09:01
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_ratings(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    aggregates = (
+        Review.objects.order_by()
+        .values('title')
+        .annotate(total=Sum('score'), amount=Count('pk'))
+    )
+    for row in aggregates.iterator():
+        Title.objects.filter(pk=row['title']).update(
+            rating_sum=row['total'], rating_count=row['amount']
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_auto_20240202_1502'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(fill_ratings, migrations.RunPython.noop),
+    ]
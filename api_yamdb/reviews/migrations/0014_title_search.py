@@ -0,0 +1,33 @@
+# Generated by Django 3.2 on 2026-10-18 06:07
+
+from django.db import migrations, models
+import django.db.models.deletion
+import reviews.search
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0013_comment_ordering'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleSearch',
+            fields=[
+                ('title', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search', serialize=False, to='reviews.title')),
+                ('name', reviews.search.FullTextField()),
+                ('description', reviews.search.FullTextField()),
+                ('document', reviews.search.FullTextField(db_column='reviews_title_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'reviews_title_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(
+            reviews.search.create_title_search,
+            reviews.search.drop_title_search,
+        ),
+    ]
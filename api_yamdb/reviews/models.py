@@ -3,31 +3,90 @@ from django.core.validators import (
     MinValueValidator,
 )
 from django.db import models
+from django.utils import timezone
 
 from api_yamdb.const import (
-    LEN_FOR_CONF_CODE,
+    LEN_FOR_CODE_HASH,
     LEN_FOR_SLUG,
     LEN_FOR_NAME,
+    LEN_FOR_STATUS,
     MIN_REVIEW_SCORE,
     MAX_REVIEW_SCORE,
 )
+from .search import TITLE_SEARCH_TABLE, FullTextField
 from .validators import validate_year
 from .user import User
 
 
 class EmailConfirmation(models.Model):
-    """Модель для подтверждения учетной записи."""
+    """
+    Хеш кода подтверждения учетной записи со сроком действия.
+    У пользователя не больше одного действующего кода.
+    """
 
-    confirmation_code = models.CharField(
-        'Код подтверждения',
-        max_length=LEN_FOR_CONF_CODE,
-        unique=True,
-    )
-    user = models.ForeignKey(
+    user = models.OneToOneField(
         User,
         on_delete=models.CASCADE,
-        related_name='confirmations',
+        related_name='confirmation',
+    )
+    code_hash = models.CharField(
+        'Хеш кода подтверждения',
+        max_length=LEN_FOR_CODE_HASH,
+    )
+    expires_at = models.DateTimeField(
+        'Действует до',
+        db_index=True,
+    )
+
+    class Meta:
+        verbose_name = 'Код подтверждения'
+        verbose_name_plural = 'Коды подтверждения'
+
+    def __str__(self):
+        return f'{self.user_id}: до {self.expires_at}'
+
+
+EMAIL_STATUSES = (
+    ('pending', 'в очереди'),
+    ('sent', 'отправлено'),
+    ('failed', 'не отправлено'),
+)
+
+
+class QueuedEmail(models.Model):
+    """Письмо в очереди на отправку."""
+
+    subject = models.CharField('Тема', max_length=LEN_FOR_NAME)
+    message = models.TextField('Текст')
+    from_email = models.EmailField('Отправитель')
+    recipient = models.EmailField('Получатель')
+    status = models.CharField(
+        'Статус',
+        max_length=LEN_FOR_STATUS,
+        choices=EMAIL_STATUSES,
+        default='pending',
+    )
+    send_after = models.DateTimeField(
+        'Отправить не раньше',
+        default=timezone.now,
     )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Очередь писем'
+        indexes = [
+            models.Index(
+                fields=['status', 'send_after'],
+                name='queued_email_status_idx',
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
 
 
 class Category(models.Model):
@@ -74,6 +133,9 @@ class Genre(models.Model):
         return self.name
 
 
+# Миграции, меняющие поля Title, в SQLite пересоздают reviews_title и
+# теряют триггеры индекса поиска: в конце такой миграции нужен
+# RunPython(reviews.search.create_title_search).
 class Title(models.Model):
     """Модель Произведений."""
 
@@ -104,14 +166,59 @@ class Title(models.Model):
         related_name='titles',
         verbose_name='Жанр',
     )
+    rating_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+        editable=False,
+    )
+    rating_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок',
+        default=0,
+        editable=False,
+    )
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        indexes = [
+            models.Index(fields=['year'], name='title_year_idx'),
+            models.Index(
+                fields=['category', 'year'],
+                name='title_category_year_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    @property
+    def rating(self):
+        """Средняя оценка произведения или None, если отзывов нет."""
+
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
+
+
+class TitleSearch(models.Model):
+    """Полнотекстовый индекс FTS5 по названию и описанию произведений."""
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        related_name='search',
+    )
+    name = FullTextField()
+    description = FullTextField()
+    document = FullTextField(db_column=TITLE_SEARCH_TABLE)
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = TITLE_SEARCH_TABLE
+
 
 class Review(models.Model):
     """Модель отзывов."""
@@ -160,11 +267,28 @@ class Review(models.Model):
                 name='unique_title_author',
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['title', 'pub_date', 'id'],
+                name='review_title_pub_date_idx',
+            )
+        ]
         ordering = ('pub_date',)
 
     def __str__(self):
         return self.text
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминает оценку из БД для пересчёта рейтинга при изменении."""
+
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_rating = (
+            instance.__dict__.get('title_id'),
+            instance.__dict__.get('score'),
+        )
+        return instance
+
 
 class Comment(models.Model):
     """Модель комментариев."""
@@ -200,6 +324,13 @@ class Comment(models.Model):
                 name='unique_review_author',
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['review', 'pub_date', 'id'],
+                name='comment_review_pub_date_idx',
+            )
+        ]
+        ordering = ('pub_date',)
 
     def __str__(self):
         return self.text
@@ -0,0 +1,60 @@
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from .models import Review, Title
+
+
+def shift_rating(title_id, score_delta, count_delta=0):
+    """Атомарно сдвинуть сумму и количество оценок произведения."""
+
+    if not score_delta and not count_delta:
+        return
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=F('rating_sum') + score_delta,
+        rating_count=F('rating_count') + count_delta,
+    )
+
+
+def _aggregate_subquery(aggregate):
+    """Подзапрос с агрегатом оценок по отзывам произведения."""
+
+    return Coalesce(
+        Subquery(
+            Review.objects.filter(title=OuterRef('pk'))
+            .order_by()
+            .values('title')
+            .annotate(value=aggregate)
+            .values('value'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def recalculate_ratings(titles=None):
+    """
+    Пересчитать сохранённый рейтинг по таблице отзывов.
+    Возвращает количество обновлённых произведений.
+    """
+
+    if titles is None:
+        titles = Title.objects.all()
+    return titles.update(
+        rating_sum=_aggregate_subquery(Sum('score')),
+        rating_count=_aggregate_subquery(Count('pk')),
+    )
+
+
+def find_rating_mismatches(titles=None):
+    """Произведения, у которых сохранённый рейтинг расходится с отзывами."""
+
+    if titles is None:
+        titles = Title.objects.all()
+    return (
+        titles.annotate(
+            actual_sum=_aggregate_subquery(Sum('score')),
+            actual_count=_aggregate_subquery(Count('pk')),
+        )
+        .exclude(rating_sum=F('actual_sum'), rating_count=F('actual_count'))
+        .order_by('pk')
+    )
@@ -0,0 +1,137 @@
+import re
+
+from django.core.checks import Error, Tags, register
+from django.db import connections, models
+from django.db.models import Lookup
+
+TITLE_SEARCH_TABLE = 'reviews_title_fts'
+
+
+def _normalized_column(column):
+    return f"replace(replace({column}, 'ё', 'е'), 'Ё', 'Е')"
+
+
+def _insert_row(prefix):
+    return (
+        f'INSERT INTO {TITLE_SEARCH_TABLE}(rowid, name, description) '
+        f'VALUES ({prefix}.id, {_normalized_column(f"{prefix}.name")}, '
+        f'{_normalized_column(f"{prefix}.description")});'
+    )
+
+
+def _delete_row(prefix):
+    return f'DELETE FROM {TITLE_SEARCH_TABLE} WHERE rowid = {prefix}.id;'
+
+
+TITLE_SEARCH_TRIGGERS = (
+    f'CREATE TRIGGER IF NOT EXISTS {TITLE_SEARCH_TABLE}_ai '
+    f'AFTER INSERT ON reviews_title BEGIN {_insert_row("new")} END;',
+    f'CREATE TRIGGER IF NOT EXISTS {TITLE_SEARCH_TABLE}_ad '
+    f'AFTER DELETE ON reviews_title BEGIN {_delete_row("old")} END;',
+    f'CREATE TRIGGER IF NOT EXISTS {TITLE_SEARCH_TABLE}_au '
+    'AFTER UPDATE OF id, name, description ON reviews_title '
+    f'BEGIN {_delete_row("old")} {_insert_row("new")} END;',
+)
+
+
+def create_title_search(apps, schema_editor):
+    """
+    Создать индекс FTS5 по произведениям и триггеры синхронизации и
+    заполнить индекс. Сейчас вызывается только миграцией 0014. SQLite
+    пересоздаёт таблицу reviews_title почти при любом изменении полей
+    Title и удаляет вместе со старой таблицей её триггеры, поэтому такие
+    миграции должны заканчиваться RunPython(create_title_search);
+    иначе об этом сообщит проверка reviews.E001.
+    """
+
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS {TITLE_SEARCH_TABLE} USING '
+        "fts5(name, description, tokenize='unicode61 remove_diacritics 2')"
+    )
+    schema_editor.execute(
+        f'INSERT INTO {TITLE_SEARCH_TABLE}({TITLE_SEARCH_TABLE}, rank) '
+        "VALUES ('rank', 'bm25(10.0, 1.0)')"
+    )
+    for trigger in TITLE_SEARCH_TRIGGERS:
+        schema_editor.execute(trigger)
+    schema_editor.execute(f'DELETE FROM {TITLE_SEARCH_TABLE}')
+    schema_editor.execute(
+        f'INSERT INTO {TITLE_SEARCH_TABLE}(rowid, name, description) '
+        f'SELECT id, {_normalized_column("name")}, '
+        f'{_normalized_column("description")} FROM reviews_title'
+    )
+
+
+def drop_title_search(apps, schema_editor):
+    """Удалить индекс FTS5 по произведениям и его триггеры."""
+
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for suffix in ('ai', 'ad', 'au'):
+        schema_editor.execute(
+            f'DROP TRIGGER IF EXISTS {TITLE_SEARCH_TABLE}_{suffix}'
+        )
+    schema_editor.execute(f'DROP TABLE IF EXISTS {TITLE_SEARCH_TABLE}')
+
+
+@register(Tags.database)
+def check_title_search_triggers(app_configs, databases=None, **kwargs):
+    """Триггеры индекса FTS5 на месте (manage.py check --database)."""
+
+    errors = []
+    for alias in databases or ():
+        connection = connections[alias]
+        if connection.vendor != 'sqlite':
+            continue
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type IN "
+                "('table', 'trigger') AND name LIKE %s",
+                [f'{TITLE_SEARCH_TABLE}%'],
+            )
+            names = {name for name, in cursor.fetchall()}
+        if TITLE_SEARCH_TABLE not in names:
+            continue
+        missing = sorted(
+            f'{TITLE_SEARCH_TABLE}_{suffix}'
+            for suffix in ('ai', 'ad', 'au')
+            if f'{TITLE_SEARCH_TABLE}_{suffix}' not in names
+        )
+        if missing:
+            errors.append(Error(
+                f'В БД {alias} нет триггеров {", ".join(missing)}: '
+                'индекс поиска по произведениям не обновляется.',
+                hint='Миграция, пересоздавшая reviews_title, должна '
+                     'вызвать reviews.search.create_title_search.',
+                id='reviews.E001',
+            ))
+    return errors
+
+
+def build_match_query(value):
+    """
+    Превратить пользовательский ввод в запрос FTS5: каждое слово
+    ищется по префиксу, все слова обязательны. None — если слов нет.
+    """
+
+    value = value.casefold().replace('ё', 'е')
+    words = re.findall(r'\w+', value)
+    if not words:
+        return None
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+class FullTextField(models.TextField):
+    """Столбец виртуальной таблицы FTS5 с поиском через lookup match."""
+
+
+@FullTextField.register_lookup
+class Match(Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', lhs_params + rhs_params
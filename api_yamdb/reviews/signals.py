@@ -0,0 +1,74 @@
+import threading
+
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import Review, Title, User
+from .ratings import recalculate_ratings, shift_rating
+
+# Каскадное удаление произведения или пользователя, которое идёт в
+# текущем потоке. Отзывы из такого удаления не сдвигают рейтинг по
+# одному: у удалённого произведения рейтинга нет, а рейтинги
+# произведений с отзывами удалённого автора пересчитываются разом.
+cascade = threading.local()
+
+
+def _deleting(name):
+    return cascade.__dict__.setdefault(name, set())
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, raw=False, **kwargs):
+    """Учесть новый отзыв или изменённую оценку в рейтинге произведения."""
+
+    if raw:
+        return
+    old_title_id, old_score = getattr(instance, '_loaded_rating', (None, None))
+    if created:
+        shift_rating(instance.title_id, instance.score, 1)
+    elif old_title_id is None or old_score is None:
+        recalculate_ratings(Title.objects.filter(pk=instance.title_id))
+    elif old_title_id != instance.title_id:
+        shift_rating(old_title_id, -old_score, -1)
+        shift_rating(instance.title_id, instance.score, 1)
+    else:
+        shift_rating(instance.title_id, instance.score - old_score)
+    instance._loaded_rating = (instance.title_id, instance.score)
+
+
+@receiver(pre_delete, sender=Title)
+def start_title_delete(sender, instance, **kwargs):
+    _deleting('titles').add(instance.pk)
+
+
+@receiver(post_delete, sender=Title)
+def finish_title_delete(sender, instance, **kwargs):
+    _deleting('titles').discard(instance.pk)
+
+
+@receiver(pre_delete, sender=User)
+def start_user_delete(sender, instance, **kwargs):
+    _deleting('users').add(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def finish_user_delete(sender, instance, **kwargs):
+    """Пересчитать рейтинги произведений с отзывами удалённого автора."""
+
+    _deleting('users').discard(instance.pk)
+    title_ids = _deleting('titles_to_recalculate')
+    if not _deleting('users') and title_ids:
+        recalculate_ratings(Title.objects.filter(pk__in=title_ids))
+        title_ids.clear()
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    """Исключить удалённый отзыв из рейтинга произведения."""
+
+    if instance.title_id in _deleting('titles'):
+        return
+    if instance.author_id in _deleting('users'):
+        _deleting('titles_to_recalculate').add(instance.title_id)
+        return
+    shift_rating(instance.title_id, -instance.score, -1)
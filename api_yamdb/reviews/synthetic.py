@@ -0,0 +1,235 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+from django.db.models import Max
+
+from api_yamdb.const import CSV_IMPORT_BATCH_SIZE
+from .csv_import import insert_rows, read_batches
+from .models import Category, Comment, Genre, Review, Title, User
+
+WORDS = (
+    'мост', 'река', 'город', 'ночь', 'утро', 'дорога', 'море', 'ветер',
+    'дом', 'сад', 'огонь', 'звезда', 'тень', 'песня', 'книга', 'письмо',
+    'зима', 'лето', 'осень', 'весна', 'герой', 'друг', 'враг', 'путь',
+    'сердце', 'память', 'время', 'правда', 'тайна', 'мечта', 'судьба',
+    'старый', 'новый', 'тихий', 'последний', 'далёкий', 'тёмный',
+    'светлый', 'живой', 'чужой', 'большой', 'ёлка', 'лёд', 'берёза',
+    'смотреть', 'ждать', 'помнить', 'искать', 'вернуться', 'играть',
+    'очень', 'снова', 'всегда', 'никогда', 'почти', 'вместе', 'долго',
+)
+CATEGORY_NAMES = (
+    'Фильм', 'Книга', 'Музыка', 'Сериал', 'Игра', 'Спектакль',
+    'Комикс', 'Мультфильм', 'Аниме', 'Подкаст',
+)
+GENRE_NAMES = (
+    'Драма', 'Комедия', 'Сказка', 'Ужасы', 'Триллер', 'Фантастика',
+    'Фэнтези', 'Детектив', 'Вестерн', 'Мелодрама', 'Боевик', 'Приключения',
+    'Исторический', 'Биография', 'Документальный', 'Мюзикл', 'Нуар',
+    'Роман', 'Поэзия', 'Рок', 'Джаз', 'Классика', 'Шансон', 'Поп',
+)
+SCORE_WEIGHTS = (2, 1, 2, 3, 5, 8, 13, 18, 16, 12)
+DATES_FROM = datetime(2010, 1, 1, tzinfo=timezone.utc)
+DATES_SPAN = int(timedelta(days=365 * 15).total_seconds())
+YEARS = (1900, 2024)
+
+
+def zipf_counts(total, size, exponent, cap):
+    """
+    Разложить total по size корзинам по закону Ципфа: k-я по
+    популярности корзина получает долю, пропорциональную 1 / k**exponent.
+    В корзину помещается не больше cap; остаток от округления
+    достаётся самым популярным корзинам.
+    """
+
+    if not size:
+        return []
+    weights = [1 / rank ** exponent for rank in range(1, size + 1)]
+    scale = total / sum(weights)
+    counts = [min(cap, int(weight * scale)) for weight in weights]
+    shortfall = total - sum(counts)
+    for index in range(size):
+        if shortfall <= 0:
+            break
+        extra = min(cap - counts[index], shortfall)
+        counts[index] += extra
+        shortfall -= extra
+    return counts
+
+
+class DatasetGenerator:
+    """
+    Генератор синтетических данных для нагрузочного тестирования.
+    Все значения берутся из random.Random(seed), поэтому на пустой БД
+    одинаковые параметры дают одинаковые данные. Строки пишутся пачками
+    через insert_rows, id назначаются подряд после уже существующих.
+    """
+
+    def __init__(self, seed=0, batch_size=CSV_IMPORT_BATCH_SIZE,
+                 zipf_exponent=1.1, progress=None):
+        self.random = random.Random(seed)
+        self.batch_size = batch_size
+        self.zipf_exponent = zipf_exponent
+        self.progress = progress
+        self.ids = {}
+
+    def first_id(self, model):
+        return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+    def write(self, model, names, rows):
+        """Записать поток строк в таблицу модели. Возвращает их число."""
+
+        fields = [model._meta.get_field(name) for name in names]
+        written = 0
+        for batch in read_batches(rows, self.batch_size):
+            insert_rows(model, fields, batch)
+            written += len(batch)
+            if self.progress:
+                self.progress(model, written)
+        return written
+
+    def text(self, min_words, max_words):
+        words = self.random.choices(
+            WORDS, k=self.random.randint(min_words, max_words)
+        )
+        return ' '.join(words).capitalize()
+
+    def date(self):
+        return DATES_FROM + timedelta(
+            seconds=self.random.randrange(DATES_SPAN)
+        )
+
+    def generate(self, users, categories, genres, titles, reviews, comments):
+        """Сгенерировать данные. Возвращает {модель: число строк}."""
+
+        return {
+            User: self.generate_users(users),
+            Category: self.generate_catalog(
+                Category, CATEGORY_NAMES, categories
+            ),
+            Genre: self.generate_catalog(Genre, GENRE_NAMES, genres),
+            Title: self.generate_titles(titles),
+            Review: self.generate_reviews(reviews),
+            Comment: self.generate_comments(comments),
+        }
+
+    def generate_users(self, count):
+        first = self.first_id(User)
+        self.ids[User] = range(first, first + count)
+        return self.write(
+            User,
+            ('id', 'username', 'email', 'role', 'bio'),
+            (
+                (
+                    pk, f'user{pk}', f'user{pk}@yamdb.fake',
+                    'moderator' if pk % 100 == 0 else 'user',
+                    self.text(0, 12),
+                )
+                for pk in self.ids[User]
+            ),
+        )
+
+    def generate_catalog(self, model, names, count):
+        first = self.first_id(model)
+        self.ids[model] = range(first, first + count)
+        return self.write(
+            model,
+            ('id', 'name', 'slug'),
+            (
+                (
+                    pk,
+                    f'{names[index % len(names)]} {pk}',
+                    f'{model._meta.model_name}-{pk}',
+                )
+                for index, pk in enumerate(self.ids[model])
+            ),
+        )
+
+    def generate_titles(self, count):
+        first = self.first_id(Title)
+        self.ids[Title] = range(first, first + count)
+        categories = self.ids[Category]
+        genres = self.ids[Genre]
+        # Популярность жанров тоже неравномерна: драм больше, чем нуара.
+        genre_weights = [1 / rank for rank in range(1, len(genres) + 1)]
+        written = self.write(
+            Title,
+            ('id', 'name', 'year', 'category', 'description'),
+            (
+                (
+                    pk,
+                    self.text(1, 4),
+                    self.random.randint(*YEARS),
+                    self.random.choice(categories) if categories else None,
+                    self.text(0, 30),
+                )
+                for pk in self.ids[Title]
+            ),
+        )
+        if genres:
+            self.write(
+                Title.genre.through,
+                ('title_id', 'genre_id'),
+                (
+                    (pk, genre)
+                    for pk in self.ids[Title]
+                    for genre in sorted(set(self.random.choices(
+                        genres, genre_weights, k=self.random.randint(1, 3)
+                    )))
+                ),
+            )
+        return written
+
+    def generate_reviews(self, count):
+        first = self.first_id(Review)
+        users = self.ids[User]
+        titles = list(self.ids[Title])
+        # У одного автора не больше одного отзыва на произведение.
+        counts = zipf_counts(count, len(titles), self.zipf_exponent,
+                             len(users))
+        self.random.shuffle(counts)
+        self.ids[Review] = range(first, first + sum(counts))
+        rows = (
+            (
+                title, self.text(3, 60), author,
+                self.random.choices(range(1, 11), SCORE_WEIGHTS)[0],
+                self.date(),
+            )
+            for title, title_count in zip(titles, counts)
+            for author in self.random.sample(users, title_count)
+        )
+        return self.write(
+            Review,
+            ('id', 'title', 'text', 'author', 'score', 'pub_date'),
+            ((pk, *row) for pk, row in zip(self.ids[Review], rows)),
+        )
+
+    def generate_comments(self, count):
+        first = self.first_id(Comment)
+        users = self.ids[User]
+        reviews = self.ids[Review]
+        if not reviews:
+            return 0
+        count = min(count, len(reviews) * len(users))
+        base, remainder = divmod(count, len(reviews))
+
+        def comment_counts():
+            # Выборочный отбор: ровно remainder отзывов получат +1.
+            left = remainder
+            for index, review in enumerate(reviews):
+                extra = self.random.random() * (len(reviews) - index) < left
+                left -= extra
+                yield review, base + extra
+
+        rows = (
+            (review, self.text(2, 30), author, self.date())
+            for review, review_count in comment_counts()
+            for author in self.random.sample(users, review_count)
+        )
+        return self.write(
+            Comment,
+            ('id', 'review', 'text', 'author', 'pub_date'),
+            (
+                (pk, *row)
+                for pk, row in zip(range(first, first + count), rows)
+            ),
+        )
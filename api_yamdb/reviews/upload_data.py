@@ -1,29 +0,0 @@
-import csv
-
-from django.conf import settings
-from django.core.management import BaseCommand
-from reviews.models import Category, Comment, Genre, Review, Title, User
-
-TABLES = {
-    User: 'users.csv',
-    Category: 'category.csv',
-    Genre: 'genre.csv',
-    Title: 'titles.csv',
-    Review: 'review.csv',
-    Comment: 'comments.csv',
-}
-
-
-class Command(BaseCommand):
-    """Скрипт, который заполняет БД csv файлами."""
-
-    def handle(self, *args, **kwargs):
-        for model, csv_f in TABLES.items():
-            with open(
-                f'{settings.BASE_DIR}/static/data/{csv_f}',
-                'r',
-                encoding='utf-8',
-            ) as csv_file:
-                reader = csv.DictReader(csv_file)
-                model.objects.bulk_create(model(**data) for data in reader)
-        self.stdout.write(self.style.SUCCESS('Все данные загружены'))
@@ -1,7 +1,7 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
-from api_yamdb.const import LEN_FOR_CONF_CODE, LEN_FOR_ROLE
+from api_yamdb.const import LEN_FOR_ROLE
 
 ROLE = (
     ('admin', 'администратор'),
@@ -27,11 +27,6 @@ class User(AbstractUser):
         choices=ROLE,
         default='user',
     )
-    user_confirmation_code = models.CharField(
-        'Код подтверждения',
-        max_length=LEN_FOR_CONF_CODE,
-        blank=True,
-    )
 
     class Meta:
         verbose_name = 'Пользователь'
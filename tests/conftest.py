@@ -1,6 +1,7 @@
 import os
 import sys
 
+import pytest
 from django.utils.version import get_version
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -33,3 +34,39 @@ assert get_version() < '4.0.0', 'Пожалуйста, используйте в
 pytest_plugins = [
     'tests.fixtures.fixture_user',
 ]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def throttle_db(settings, tmp_path):
+    settings.THROTTLE_DB_PATH = tmp_path / 'throttle.sqlite3'
+
+
+@pytest.fixture(autouse=True)
+def query_inspector(settings):
+    """Превышение бюджета SQL-запросов или N+1 в тестах — ошибка."""
+
+    settings.QUERY_INSPECTOR_RAISE = True
+
+
+@pytest.fixture(autouse=True)
+def metrics_dir(settings, tmp_path):
+    settings.METRICS_DIR = tmp_path / 'metrics'
+
+
+@pytest.fixture(autouse=True)
+def profiler_dir(settings, tmp_path):
+    settings.PROFILER_DIR = tmp_path / 'profiles'
+
+
+@pytest.fixture(autouse=True)
+def response_cache_db(settings, tmp_path):
+    settings.RESPONSE_CACHE_DB_PATH = tmp_path / 'response_cache.sqlite3'
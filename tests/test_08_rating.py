@@ -0,0 +1,129 @@
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from api.views import TitleViewSet, UserViewSet
+from reviews.models import Review, Title, User
+from tests.utils import create_reviews, create_title_with_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08Rating:
+
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_title(self, title_id):
+        return Title.objects.get(pk=title_id)
+
+    def test_01_rating_follows_reviews(self, admin_client, admin, user,
+                                       user_client, moderator,
+                                       moderator_client):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client,
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        title = self.get_title(title_id)
+        assert (title.rating_sum, title.rating_count) == (15, 3), (
+            'Проверьте, что при создании отзыва обновляются '
+            '`rating_sum` и `rating_count` произведения.'
+        )
+        assert self.get_title(titles[1]['id']).rating is None
+
+        user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[1]['id']
+            ),
+            data={'score': 8},
+        )
+        title = self.get_title(title_id)
+        assert (title.rating_sum, title.rating_count) == (18, 3), (
+            'Проверьте, что изменение оценки отзыва учитывается в рейтинге.'
+        )
+
+        admin_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[0]['id']
+            )
+        )
+        title = self.get_title(title_id)
+        assert (title.rating_sum, title.rating_count) == (13, 2), (
+            'Проверьте, что удаление отзыва учитывается в рейтинге.'
+        )
+
+        moderator.delete()
+        title = self.get_title(title_id)
+        assert (title.rating_sum, title.rating_count) == (8, 1), (
+            'Проверьте, что каскадное удаление отзывов пользователя '
+            'учитывается в рейтинге.'
+        )
+        assert title.rating == 8
+
+    def test_02_recalculate_ratings_command(self, admin_client, admin, user,
+                                            user_client):
+        _, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_id = titles[0]['id']
+        call_command('recalculate_ratings', '--check', stdout=StringIO())
+
+        Title.objects.filter(pk=title_id).update(rating_sum=0, rating_count=0)
+        with pytest.raises(CommandError):
+            call_command('recalculate_ratings', '--check', stdout=StringIO())
+
+        call_command('recalculate_ratings', stdout=StringIO())
+        title = self.get_title(title_id)
+        assert (title.rating_sum, title.rating_count) == (10, 2), (
+            'Проверьте, что команда `recalculate_ratings` восстанавливает '
+            'рейтинг по таблице отзывов.'
+        )
+        call_command('recalculate_ratings', '--check', stdout=StringIO())
+
+    def test_03_cascade_delete_is_not_n_plus_one(self, admin_client):
+        title = create_title_with_reviews(6)
+        author, other_author = User.objects.filter(
+            username__in=('reviewer0', 'reviewer1')
+        ).order_by('username')
+        others = []
+        for idx in range(6):
+            other = Title.objects.create(
+                name=f'Другое {idx}', year=2000, category=title.category
+            )
+            Review.objects.create(
+                title=other, author=author, text='Да', score=7
+            )
+            Review.objects.create(
+                title=other, author=other_author, text='Нет', score=3
+            )
+            others.append(other)
+
+        response = admin_client.delete(f'/api/v1/users/{author.username}/')
+        assert response.status_code == 204
+        assert (
+            response.wsgi_request.query_report.count
+            <= UserViewSet.query_budget['destroy']
+        ), (
+            'Проверьте, что удаление пользователя с отзывами пересчитывает '
+            'рейтинги одним запросом, а не по запросу на отзыв.'
+        )
+        for other in others:
+            other.refresh_from_db()
+            assert (other.rating_sum, other.rating_count) == (3, 1)
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (25, 5)
+
+        response = admin_client.delete(f'/api/v1/titles/{title.pk}/')
+        assert response.status_code == 204
+        assert (
+            response.wsgi_request.query_report.count
+            <= TitleViewSet.query_budget['destroy']
+        ), (
+            'Проверьте, что удаление произведения не обновляет его рейтинг '
+            'по запросу на каждый отзыв.'
+        )
+        assert not Review.objects.filter(title_id=title.pk).exists()
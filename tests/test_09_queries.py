@@ -0,0 +1,161 @@
+import pytest
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+
+from api.serializers import ReviewSerializer, TitleCreateSerializer
+from reviews.models import Comment, Title, User
+from tests.utils import create_catalog, create_title_with_reviews
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f'GET-запрос к `{url}` должен возвращать ответ со статусом 200.'
+    )
+    return len(context.captured_queries)
+
+
+def count_selects_from(context, table):
+    return sum(
+        query['sql'].startswith('SELECT')
+        and f'FROM "{table}"' in query['sql']
+        for query in context.captured_queries
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09Queries:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_titles_list_query_budget(self, client):
+        create_catalog(30)
+        small_page = count_queries(client, f'{self.TITLES_URL}?limit=2')
+        large_page = count_queries(client, f'{self.TITLES_URL}?limit=30')
+        assert small_page == large_page, (
+            f'Проверьте, что количество запросов к БД при GET-запросе к '
+            f'`{self.TITLES_URL}` не зависит от размера страницы: '
+            f'{small_page} запросов для 2 произведений и {large_page} '
+            'для 30.'
+        )
+
+    def test_02_title_detail_and_create_query_budget(self, client,
+                                                     admin_client):
+        titles = create_catalog(3)
+        detail_queries = count_queries(
+            client, f'{self.TITLES_URL}{titles[0].id}/'
+        )
+        assert detail_queries <= 2, (
+            'Проверьте, что GET-запрос к `/api/v1/titles/{title_id}/` '
+            'загружает категорию и жанры без дополнительных запросов.'
+        )
+
+        rendered = []
+        for genres in (['genre-0'], ['genre-0', 'genre-1', 'genre-2']):
+            data = {
+                'name': 'Новое произведение',
+                'year': 2001,
+                'genre': genres,
+                'category': 'category-0',
+            }
+            response = admin_client.post(self.TITLES_URL, data=data)
+            assert response.status_code == 201
+            title = Title.objects.get(pk=response.json()['id'])
+            with CaptureQueriesContext(connection) as context:
+                TitleCreateSerializer(title).data
+            rendered.append(len(context.captured_queries))
+        assert rendered[0] == rendered[1], (
+            'Проверьте, что ответ на POST-запрос к `/api/v1/titles/` '
+            'формируется за одинаковое количество запросов независимо от '
+            'числа жанров.'
+        )
+
+    def test_03_nested_parents_resolved_once(self, user_client):
+        title = create_title_with_reviews(2)
+        review = title.reviews.first()
+        reviews_url = f'/api/v1/titles/{title.id}/reviews/'
+        comments_url = f'{reviews_url}{review.id}/comments/'
+
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(
+                reviews_url, data={'text': 'Отзыв', 'score': 7}
+            )
+        assert response.status_code == 201
+        assert count_selects_from(context, 'reviews_title') == 1, (
+            f'Проверьте, что POST-запрос к `{reviews_url}` получает '
+            'произведение из БД один раз.'
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(comments_url, data={'text': 'Да'})
+        assert response.status_code == 201
+        parent_queries = (
+            count_selects_from(context, 'reviews_review')
+            + count_selects_from(context, 'reviews_title')
+        )
+        assert parent_queries == 1, (
+            f'Проверьте, что POST-запрос к `{comments_url}` получает отзыв '
+            'и произведение одним запросом.'
+        )
+
+    def test_04_nested_lists_query_budget(self, client):
+        title = create_title_with_reviews(12)
+        review = title.reviews.first()
+        for author in User.objects.all():
+            Comment.objects.create(review=review, author=author, text='Да')
+        reviews_url = f'/api/v1/titles/{title.id}/reviews/'
+        comments_url = f'{reviews_url}{review.id}/comments/'
+        for url in (reviews_url, comments_url):
+            for mode in ('', 'cursor=&'):
+                small_page = count_queries(client, f'{url}?{mode}limit=2')
+                large_page = count_queries(client, f'{url}?{mode}limit=12')
+                assert small_page == large_page, (
+                    f'Проверьте, что количество запросов к БД при '
+                    f'GET-запросе к `{url}` не зависит от размера страницы: '
+                    f'{small_page} запросов для 2 объектов и {large_page} '
+                    'для 12.'
+                )
+
+    def test_05_duplicates_rejected_by_constraints(self, user_client):
+        title = create_title_with_reviews(1)
+        review = title.reviews.first()
+        reviews_url = f'/api/v1/titles/{title.id}/reviews/'
+        comments_url = f'{reviews_url}{review.id}/comments/'
+        data = {'text': 'Отзыв', 'score': 7}
+
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(reviews_url, data=data)
+        assert response.status_code == 201
+        assert not any(
+            'SELECT (1) AS "a"' in query['sql']
+            for query in context.captured_queries
+        ), (
+            f'Проверьте, что POST-запрос к `{reviews_url}` не проверяет '
+            'наличие отзыва отдельным запросом.'
+        )
+        response = user_client.post(reviews_url, data=data)
+        assert response.status_code == 400, (
+            'Проверьте, что повторный отзыв того же автора возвращает '
+            'ответ со статусом 400.'
+        )
+        assert 'non_field_errors' in response.json()
+        assert Title.objects.get(pk=title.id).rating_count == 2, (
+            'Проверьте, что отклонённый отзыв не учитывается в рейтинге.'
+        )
+
+        response = user_client.post(comments_url, data={'text': 'Да'})
+        assert response.status_code == 201
+        response = user_client.post(comments_url, data={'text': 'Да'})
+        assert response.status_code == 400, (
+            'Проверьте, что повторный комментарий того же автора к отзыву '
+            'возвращает ответ со статусом 400.'
+        )
+
+    def test_06_other_integrity_errors_not_masked(self, user):
+        title = create_title_with_reviews(0)
+        with pytest.raises(IntegrityError):
+            ReviewSerializer().create({
+                'text': 'Отзыв', 'score': 7, 'title': title,
+                'author_id': user.id + 1000,
+            })
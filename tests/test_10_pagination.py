@@ -0,0 +1,133 @@
+import json
+from base64 import urlsafe_b64encode
+
+import pytest
+
+from api_yamdb.const import MAX_PAGE_SIZE
+from reviews.models import Category, Comment, Title, User
+from tests.utils import create_title_with_reviews
+
+
+def walk_forward(client, url):
+    collected = []
+    pages = 0
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200, (
+            f'GET-запрос к `{url}` должен возвращать ответ со статусом 200.'
+        )
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что в режиме keyset ответ не содержит `count`.'
+        )
+        collected.extend(item['id'] for item in data['results'])
+        url = data['next']
+        pages += 1
+    return collected, pages
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10KeysetPagination:
+
+    def test_01_titles_keyset(self, client):
+        category = Category.objects.create(name='Фильм', slug='films')
+        ids = [
+            Title.objects.create(
+                name=f'Произведение {idx}', year=2000, category=category
+            ).id
+            for idx in range(7)
+        ]
+        collected, pages = walk_forward(
+            client, '/api/v1/titles/?cursor=&limit=3'
+        )
+        assert collected == ids and pages == 3, (
+            'Проверьте, что переход по ссылкам `next` в режиме keyset '
+            'возвращает все произведения по порядку `id` без повторов.'
+        )
+
+        response = client.get('/api/v1/titles/?limit=3&offset=3')
+        data = response.json()
+        assert data['count'] == 7 and len(data['results']) == 3, (
+            'Проверьте, что пагинация limit/offset продолжает работать.'
+        )
+
+    def test_02_reviews_keyset_both_directions(self, client):
+        title = create_title_with_reviews(5)
+        url = f'/api/v1/titles/{title.id}/reviews/?cursor=&limit=2'
+        forward = []
+        last_page = None
+        while url:
+            data = client.get(url).json()
+            forward.extend(review['id'] for review in data['results'])
+            last_page = data
+            url = data['next']
+        expected = list(
+            title.reviews.order_by('pub_date', 'id').values_list(
+                'id', flat=True
+            )
+        )
+        assert forward == expected, (
+            'Проверьте, что отзывы в режиме keyset упорядочены по '
+            '(`pub_date`, `id`) и возвращаются без повторов.'
+        )
+
+        backward = [review['id'] for review in last_page['results']]
+        url = last_page['previous']
+        while url:
+            data = client.get(url).json()
+            backward = [review['id'] for review in data['results']] + backward
+            url = data['previous']
+        assert backward == expected, (
+            'Проверьте, что ссылки `previous` в режиме keyset возвращают '
+            'предыдущие страницы.'
+        )
+
+    def test_03_invalid_cursor(self, client):
+        response = client.get('/api/v1/titles/?cursor=not-a-cursor')
+        assert response.status_code == 404, (
+            'Проверьте, что некорректный курсор приводит к ответу 404.'
+        )
+        title = create_title_with_reviews(1)
+        reviews_url = f'/api/v1/titles/{title.id}/reviews/'
+        for url, values in (
+            ('/api/v1/titles/', [{'a': 1}]),
+            ('/api/v1/titles/', [None]),
+            ('/api/v1/titles/', ['garbage']),
+            (reviews_url, ['garbage', 1]),
+            (reviews_url, [None, None]),
+            (reviews_url, ['2020-01-01T00:00:00', [1]]),
+        ):
+            cursor = urlsafe_b64encode(
+                json.dumps({'v': values}).encode()
+            ).decode()
+            response = client.get(f'{url}?cursor={cursor}')
+            assert response.status_code == 404, (
+                f'Проверьте, что курсор со значениями {values} для `{url}` '
+                'приводит к ответу 404.'
+            )
+
+    def test_04_comments_paginated(self, client):
+        title = create_title_with_reviews(4)
+        review = title.reviews.first()
+        for author in User.objects.all():
+            Comment.objects.create(review=review, author=author, text='text')
+        url = f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        data = client.get(f'{url}?limit=3').json()
+        assert data['count'] == 4 and len(data['results']) == 3, (
+            f'Проверьте, что для эндпоинта `{url}` настроена пагинация '
+            'limit/offset.'
+        )
+        collected, pages = walk_forward(client, f'{url}?cursor=&limit=3')
+        assert len(collected) == 4 and pages == 2, (
+            f'Проверьте, что для эндпоинта `{url}` доступен режим keyset.'
+        )
+
+    def test_05_max_page_size(self, client):
+        title = create_title_with_reviews(MAX_PAGE_SIZE + 1)
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        for query in ('?limit=1000', '?cursor=&limit=1000'):
+            data = client.get(f'{url}{query}').json()
+            assert len(data['results']) == MAX_PAGE_SIZE, (
+                'Проверьте, что размер страницы ограничен '
+                f'{MAX_PAGE_SIZE} элементами.'
+            )
@@ -0,0 +1,91 @@
+import pytest
+from django.db import connection
+
+from reviews.models import Category, Title
+from reviews.search import (
+    TITLE_SEARCH_TRIGGERS,
+    check_title_search_triggers,
+)
+
+
+def search(client, query):
+    response = client.get(f'/api/v1/titles/?{query}')
+    assert response.status_code == 200
+    return [title['name'] for title in response.json()['results']]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11TitleSearch:
+
+    def create_titles(self):
+        category = Category.objects.create(name='Фильм', slug='films')
+        titles = {}
+        for name, description in (
+            ('Мост через реку Квай', 'Военная драма.'),
+            ('ЁЛКИ', 'Новогодняя комедия про мост.'),
+            ('Мостовая', ''),
+        ):
+            titles[name] = Title.objects.create(
+                name=name, year=2000, category=category,
+                description=description,
+            )
+        return titles
+
+    def test_01_unicode_case_insensitive_name(self, client):
+        self.create_titles()
+        assert set(search(client, 'name=мост')) == {
+            'Мост через реку Квай', 'Мостовая'
+        }, (
+            'Проверьте, что фильтр `name` находит произведения без учёта '
+            'регистра кириллицы.'
+        )
+        assert search(client, 'name=елки') == ['ЁЛКИ'], (
+            'Проверьте, что фильтр `name` не различает `е` и `ё`.'
+        )
+        assert search(client, 'name=МОСТ ЧЕРЕЗ') == [
+            'Мост через реку Квай'
+        ]
+
+    def test_02_q_ranks_name_matches_first(self, client):
+        self.create_titles()
+        found = search(client, 'q=мост')
+        assert len(found) == 3 and found[-1] == 'ЁЛКИ', (
+            'Проверьте, что параметр `q` ищет и по описанию, а совпадения '
+            'в названии ранжируются выше.'
+        )
+
+    def test_03_index_follows_changes(self, client, admin_client):
+        titles = self.create_titles()
+        title = titles['Мостовая']
+        response = admin_client.patch(
+            f'/api/v1/titles/{title.id}/', data={'name': 'Брусчатка'}
+        )
+        assert response.status_code == 200
+        assert search(client, 'name=брусчатка') == ['Брусчатка'], (
+            'Проверьте, что поисковый индекс обновляется при изменении '
+            'названия произведения.'
+        )
+        assert 'Мостовая' not in search(client, 'name=мостовая')
+
+        titles['ЁЛКИ'].delete()
+        assert search(client, 'q=новогодняя') == [], (
+            'Проверьте, что удалённые произведения не находятся поиском.'
+        )
+
+    def test_04_missing_trigger_reported(self):
+        assert check_title_search_triggers(None, databases=['default']) == []
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER reviews_title_fts_au')
+        try:
+            errors = check_title_search_triggers(
+                None, databases=['default']
+            )
+        finally:
+            with connection.cursor() as cursor:
+                for statement in TITLE_SEARCH_TRIGGERS:
+                    cursor.execute(statement)
+        assert [error.id for error in errors] == ['reviews.E001'], (
+            'Проверьте, что проверка reviews.E001 сообщает о пропавшем '
+            'триггере индекса поиска'
+        )
+        assert 'reviews_title_fts_au' in errors[0].msg
@@ -0,0 +1,88 @@
+import pytest
+
+from reviews.models import Category, Genre, Title
+
+
+def filter_titles(client, query):
+    response = client.get(f'/api/v1/titles/?{query}')
+    assert response.status_code == 200
+    return sorted(title['year'] for title in response.json()['results'])
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12TitleFilters:
+
+    def create_titles(self):
+        films = Category.objects.create(name='Фильм', slug='films')
+        books = Category.objects.create(name='Книги', slug='books')
+        for year, category in (
+            (1919, books), (1994, films), (1994, books), (2019, films),
+        ):
+            Title.objects.create(
+                name=f'Произведение {year}', year=year, category=category
+            )
+
+    def test_01_exact_year(self, client):
+        self.create_titles()
+        assert filter_titles(client, 'year=19') == [], (
+            'Проверьте, что фильтр `year` ищет точное совпадение года.'
+        )
+        assert filter_titles(client, 'year=1994') == [1994, 1994]
+
+    def test_02_year_range(self, client):
+        self.create_titles()
+        assert filter_titles(client, 'year_min=1994') == [1994, 1994, 2019]
+        assert filter_titles(client, 'year_max=1994') == [1919, 1994, 1994]
+        assert filter_titles(
+            client, 'year_min=1990&year_max=2000&category=films'
+        ) == [1994], (
+            'Проверьте, что фильтры `year_min` и `year_max` ограничивают '
+            'диапазон лет и сочетаются с другими фильтрами.'
+        )
+
+    def test_03_year_filter_uses_index(self):
+        plan = Title.objects.filter(year__gte=1990, year__lte=2000).explain()
+        assert 'title_year_idx' in plan or 'title_category_year_idx' in plan, (
+            'Проверьте, что фильтрация по году использует индекс.'
+        )
+
+    def test_04_genre_and_category_lists(self, client):
+        films = Category.objects.create(name='Фильм', slug='films')
+        books = Category.objects.create(name='Книги', slug='books')
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        Genre.objects.create(name='Драмеди', slug='dramedy')
+        for year, category, genres in (
+            (2001, films, [drama, comedy]),
+            (2002, films, [drama]),
+            (2003, books, [comedy]),
+            (2004, books, []),
+        ):
+            title = Title.objects.create(
+                name=f'Произведение {year}', year=year, category=category
+            )
+            title.genre.set(genres)
+
+        assert filter_titles(client, 'genre=drama') == [2001, 2002], (
+            'Проверьте, что фильтр `genre` сравнивает слаг целиком.'
+        )
+        assert filter_titles(client, 'genre=drama,comedy') == [
+            2001, 2002, 2003
+        ], (
+            'Проверьте, что фильтр `genre` принимает список слагов и '
+            'не дублирует произведения с несколькими жанрами.'
+        )
+        assert filter_titles(
+            client, 'genre=drama,comedy&genre_mode=all'
+        ) == [2001], (
+            'Проверьте, что `genre_mode=all` оставляет произведения со '
+            'всеми перечисленными жанрами.'
+        )
+        assert filter_titles(client, 'category=films,books') == [
+            2001, 2002, 2003, 2004
+        ]
+        response = client.get('/api/v1/titles/?genre=drama&genre_mode=none')
+        assert response.status_code == 400, (
+            'Проверьте, что неизвестное значение `genre_mode` возвращает '
+            'ответ со статусом 400.'
+        )
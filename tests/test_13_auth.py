@@ -0,0 +1,148 @@
+import threading
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.authentication import (
+    get_user_cache_key,
+    get_user_store,
+    get_user_version,
+)
+
+
+def count_user_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    queries = sum(
+        'FROM "reviews_user"' in query['sql']
+        for query in context.captured_queries
+    )
+    return response, queries
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13CachedAuthentication:
+
+    USERS_URL = '/api/v1/users/'
+    CATEGORIES_URL = '/api/v1/categories/'
+
+    def test_01_no_auth_queries_when_cached(self, admin_client):
+        response, _ = count_user_queries(admin_client, self.CATEGORIES_URL)
+        assert response.status_code == 200
+        response, queries = count_user_queries(
+            admin_client, self.CATEGORIES_URL
+        )
+        assert response.status_code == 200
+        assert queries == 0, (
+            'Проверьте, что повторный запрос с тем же токеном не читает '
+            'пользователя из БД.'
+        )
+
+    def test_02_role_change_applies_immediately(self, admin_client, user,
+                                                user_client):
+        response, _ = count_user_queries(user_client, self.USERS_URL)
+        assert response.status_code == 403
+        response = admin_client.patch(
+            f'{self.USERS_URL}{user.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == 200
+        response, _ = count_user_queries(user_client, self.USERS_URL)
+        assert response.status_code == 200, (
+            'Проверьте, что смена роли пользователя учитывается со '
+            'следующего запроса.'
+        )
+
+        user.refresh_from_db()
+        user.is_active = False
+        user.save()
+        response, _ = count_user_queries(user_client, self.USERS_URL)
+        assert response.status_code == 401, (
+            'Проверьте, что заблокированный пользователь не проходит '
+            'аутентификацию.'
+        )
+
+    def test_03_cache_shared_between_processes(self, user, user_client):
+        response, _ = count_user_queries(user_client, self.USERS_URL)
+        assert response.status_code == 403
+        key = get_user_cache_key(
+            user.id, get_user_version(get_user_store(), user.id)
+        )
+        assert cache.get(key) is None, (
+            'Проверьте, что кеш аутентификации не хранится в памяти '
+            'процесса.'
+        )
+        found = []
+        # У другого потока своё соединение с хранилищем, как у другого
+        # процесса.
+        thread = threading.Thread(
+            target=lambda: found.append(get_user_store().get(key))
+        )
+        thread.start()
+        thread.join()
+        assert found[0]['role'] == user.role, (
+            'Проверьте, что запись кеша аутентификации видна из других '
+            'процессов.'
+        )
+
+    def test_04_stale_write_after_change_ignored(self, admin, admin_client):
+        response, _ = count_user_queries(admin_client, self.USERS_URL)
+        assert response.status_code == 200
+        store = get_user_store()
+        # Запрос прочитал версию и строку до смены роли, а записал их в
+        # кеш уже после неё.
+        stale_key = get_user_cache_key(
+            admin.id, get_user_version(store, admin.id)
+        )
+        stale = store.get(stale_key)
+        admin.role = 'user'
+        admin.save()
+        store.set(stale_key, stale, 60)
+        response, _ = count_user_queries(admin_client, self.USERS_URL)
+        assert response.status_code == 403, (
+            'Проверьте, что запоздалая запись прежней строки пользователя '
+            'в кеш не возвращает ему снятую роль.'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13Signup:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    def signup_user_queries(self, client, data):
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(self.URL_SIGNUP, data=data)
+        queries = sum(
+            'reviews_user' in query['sql']
+            and not query['sql'].startswith(('SAVEPOINT', 'RELEASE'))
+            for query in context.captured_queries
+        )
+        return response, queries
+
+    def test_01_signup_queries_do_not_grow_with_users(self, client,
+                                                      django_user_model):
+        django_user_model.objects.bulk_create(
+            django_user_model(username=f'user{idx}',
+                              email=f'user{idx}@yamdb.fake')
+            for idx in range(200)
+        )
+        data = {'username': 'newcomer', 'email': 'newcomer@yamdb.fake'}
+        for _ in range(2):
+            response, queries = self.signup_user_queries(client, data)
+            assert response.status_code == 200
+            assert queries <= 2, (
+                'Проверьте, что регистрация и повторный запрос кода '
+                'обращаются к таблице пользователей не более двух раз, '
+                f'сейчас запросов: {queries}.'
+            )
+
+        response, _ = self.signup_user_queries(
+            client, {'username': 'newcomer', 'email': 'other@yamdb.fake'}
+        )
+        assert response.status_code == 400 and 'username' in response.json()
+        response, _ = self.signup_user_queries(
+            client, {'username': 'other', 'email': 'newcomer@yamdb.fake'}
+        )
+        assert response.status_code == 400 and 'email' in response.json()
@@ -0,0 +1,141 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+from reviews.mail_queue import claim_batch, lease, queue_email
+from reviews.models import QueuedEmail
+
+
+class FailingEmailBackend(BaseEmailBackend):
+    """Почтовый бэкенд, который не может отправить ни одного письма."""
+
+    def send_messages(self, email_messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+class UnreachableEmailBackend(BaseEmailBackend):
+    """Почтовый бэкенд, который не может подключиться к серверу."""
+
+    def open(self):
+        raise ConnectionRefusedError('Нет соединения с SMTP')
+
+    def send_messages(self, email_messages):
+        raise AssertionError('Письма отправляются без соединения.')
+
+
+def drain_queue():
+    call_command('send_queued_emails', stdout=StringIO())
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14EmailQueue:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    def test_01_signup_queues_email(self, client):
+        data = {'email': 'queued@yamdb.fake', 'username': 'queued'}
+        response = client.post(self.URL_SIGNUP, data=data)
+        assert response.status_code == 200
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что регистрация не отправляет письмо синхронно.'
+        )
+        email = QueuedEmail.objects.get()
+        assert email.recipient == data['email'] and email.status == 'pending'
+
+        drain_queue()
+        assert len(mail.outbox) == 1 and mail.outbox[0].to == [
+            data['email']
+        ], 'Проверьте, что команда отправляет письма из очереди.'
+        email.refresh_from_db()
+        assert email.status == 'sent' and email.sent_at is not None
+        assert email.message == '', (
+            'Проверьте, что текст отправленного письма с кодом '
+            'подтверждения не хранится в очереди.'
+        )
+
+        drain_queue()
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что отправленное письмо не отправляется повторно.'
+        )
+
+    def test_02_failed_delivery_is_retried(self, client, settings):
+        settings.EMAIL_BACKEND = (
+            'tests.test_14_email_queue.FailingEmailBackend'
+        )
+        client.post(
+            self.URL_SIGNUP,
+            data={'email': 'retry@yamdb.fake', 'username': 'retry'},
+        )
+        drain_queue()
+        email = QueuedEmail.objects.get()
+        assert email.status == 'pending' and email.attempts == 1, (
+            'Проверьте, что неотправленное письмо остаётся в очереди.'
+        )
+        assert 'SMTP недоступен' in email.last_error
+
+        QueuedEmail.objects.update(send_after=email.created, attempts=4)
+        drain_queue()
+        email.refresh_from_db()
+        assert email.status == 'failed', (
+            'Проверьте, что после исчерпания попыток письмо помечается '
+            'неотправленным.'
+        )
+
+    def test_03_connection_failure_fails_batch(self, settings):
+        settings.EMAIL_BACKEND = (
+            'tests.test_14_email_queue.UnreachableEmailBackend'
+        )
+        for number in range(3):
+            queue_email('Тема', 'Текст', 'from@yamdb.fake',
+                        f'user{number}@yamdb.fake')
+        started = timezone.now()
+        drain_queue()
+        emails = QueuedEmail.objects.all()
+        assert all(
+            email.status == 'pending' and email.attempts == 1
+            and 'Нет соединения с SMTP' in email.last_error
+            and email.send_after > started
+            for email in emails
+        ), (
+            'Проверьте, что при ошибке подключения к почтовому серверу '
+            'попытка засчитывается всем письмам пачки, а их отправка '
+            'откладывается.'
+        )
+
+    def test_04_claimed_email_is_not_leased_twice(self):
+        queue_email('Тема', 'Текст', 'from@yamdb.fake', 'user@yamdb.fake')
+        # Второй воркер прочитал письмо до того, как его забрал первый.
+        stale = list(QueuedEmail.objects.all())
+        assert len(claim_batch()) == 1
+        until = timezone.now() + timedelta(seconds=60)
+        assert lease(stale, until) == [], (
+            'Проверьте, что письмо, которое уже забрал другой воркер, '
+            'не забирается повторно.'
+        )
+
+    def test_05_finished_emails_purged(self):
+        for number in range(3):
+            queue_email('Тема', 'Текст', 'from@yamdb.fake',
+                        f'user{number}@yamdb.fake')
+        drain_queue()
+        QueuedEmail.objects.create(
+            subject='Тема', message='Текст', from_email='from@yamdb.fake',
+            recipient='pending@yamdb.fake',
+            send_after=timezone.now() + timedelta(days=2),
+        )
+        assert QueuedEmail.objects.filter(status='sent').count() == 3
+        QueuedEmail.objects.update(
+            created=timezone.now() - timedelta(days=2)
+        )
+        drain_queue()
+        assert list(
+            QueuedEmail.objects.values_list('recipient', flat=True)
+        ) == ['pending@yamdb.fake'], (
+            'Проверьте, что команда удаляет давно отправленные письма и '
+            'не трогает письма в очереди.'
+        )
@@ -0,0 +1,102 @@
+import re
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api import confirmation
+from reviews.models import EmailConfirmation, QueuedEmail
+
+
+class RacingCache:
+    """Кеш, в котором код гасит параллельный запрос сразу после чтения."""
+
+    def get(self, key):
+        value = cache.get(key)
+        cache.delete(key)
+        return value
+
+    def delete(self, key):
+        return cache.delete(key)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15ConfirmationCodes:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    URL_TOKEN = '/api/v1/auth/token/'
+    SIGNUP_DATA = {'username': 'coder', 'email': 'coder@yamdb.fake'}
+
+    def signup(self, client):
+        response = client.post(self.URL_SIGNUP, data=self.SIGNUP_DATA)
+        assert response.status_code == 200
+        message = QueuedEmail.objects.order_by('-id').first().message
+        return re.search(r'\d+$', message).group()
+
+    def get_token(self, client, code):
+        return client.post(
+            self.URL_TOKEN,
+            data={'username': 'coder', 'confirmation_code': code},
+        )
+
+    def test_01_code_is_hashed_and_single_use(self, client):
+        code = self.signup(client)
+        confirmation = EmailConfirmation.objects.get()
+        assert code not in confirmation.code_hash, (
+            'Проверьте, что код подтверждения хранится только в виде хеша.'
+        )
+        response = self.get_token(client, code)
+        assert response.status_code == 200 and 'token' in response.json()
+        assert self.get_token(client, code).status_code == 400, (
+            'Проверьте, что код подтверждения действует один раз.'
+        )
+
+    def test_02_repeat_signup_does_not_touch_users(self, client):
+        self.signup(client)
+        with CaptureQueriesContext(connection) as context:
+            code = self.signup(client)
+        assert not any(
+            query['sql'].startswith('UPDATE "reviews_user"')
+            for query in context.captured_queries
+        ), (
+            'Проверьте, что повторный запрос кода не изменяет строку '
+            'пользователя.'
+        )
+        assert EmailConfirmation.objects.count() == 1
+        assert self.get_token(client, code).status_code == 200
+
+    def test_03_expired_codes(self, client):
+        code = self.signup(client)
+        EmailConfirmation.objects.update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        assert self.get_token(client, code).status_code == 400, (
+            'Проверьте, что истёкший код подтверждения не принимается.'
+        )
+        call_command('purge_confirmation_codes', stdout=StringIO())
+        assert not EmailConfirmation.objects.exists(), (
+            'Проверьте, что команда `purge_confirmation_codes` удаляет '
+            'истёкшие коды.'
+        )
+
+    def test_04_cache_store(self, client, settings):
+        settings.CONFIRMATION_CODE_STORE = 'api.confirmation.CacheCodeStore'
+        code = self.signup(client)
+        assert not EmailConfirmation.objects.exists()
+        assert self.get_token(client, '00000').status_code == 400
+        assert self.get_token(client, code).status_code == 200
+        assert self.get_token(client, code).status_code == 400
+
+    def test_05_cache_code_used_once(self, monkeypatch, user):
+        store = confirmation.CacheCodeStore()
+        code = store.issue(user)
+        monkeypatch.setattr(confirmation, 'cache', RacingCache())
+        assert not store.check(user, code), (
+            'Проверьте, что код из кеша принимает только тот из '
+            'одновременных запросов, который его удалил.'
+        )
@@ -0,0 +1,75 @@
+import pytest
+
+from api.throttling import CacheBucketStore, SQLiteBucketStore
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+TOKEN_URL = '/api/v1/auth/token/'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16Throttling:
+
+    @pytest.mark.parametrize('store', (SQLiteBucketStore, CacheBucketStore))
+    def test_01_bucket_refills(self, store):
+        keys = ['test:ip:127.0.0.1']
+        for _ in range(3):
+            assert store().consume(keys, 3, 1.0, now=100.0) == 0
+        assert store().consume(keys, 3, 1.0, now=100.0) == 1.0, (
+            'Проверьте, что пустое ведро возвращает время ожидания токена.'
+        )
+        assert store().consume(keys, 3, 1.0, now=101.5) == 0, (
+            'Проверьте, что ведро пополняется со временем.'
+        )
+        assert store().consume(keys + ['test:username:new'], 3, 1.0,
+                               now=101.5) == 0.5, (
+            'Проверьте, что запрос отклоняется, если пусто хотя бы одно '
+            'из его вёдер.'
+        )
+
+    def test_02_signup_throttled_by_ip(self, client):
+        for number in range(5):
+            client.post(SIGNUP_URL, data={
+                'username': f'user{number}', 'email': f'user{number}@ya.ru'
+            })
+        response = client.post(SIGNUP_URL, data={
+            'username': 'another', 'email': 'another@ya.ru'
+        })
+        assert response.status_code == 429, (
+            'Проверьте, что частые запросы к `/api/v1/auth/signup/` с '
+            'одного адреса получают ответ со статусом 429.'
+        )
+        assert int(response['Retry-After']) > 0, (
+            'Проверьте, что ответ 429 содержит заголовок `Retry-After`.'
+        )
+
+    def test_03_token_throttled_by_username(self, client, user):
+        for number in range(5):
+            client.post(
+                TOKEN_URL,
+                data={'username': user.username, 'confirmation_code': '0'},
+                REMOTE_ADDR=f'10.0.0.{number}',
+            )
+        response = client.post(
+            TOKEN_URL,
+            data={'username': user.username, 'confirmation_code': '0'},
+            REMOTE_ADDR='10.0.0.100',
+        )
+        assert response.status_code == 429, (
+            'Проверьте, что перебор кода подтверждения для одного '
+            'пользователя ограничивается и с разных адресов.'
+        )
+        response = client.post(
+            TOKEN_URL,
+            data={'username': 'other', 'confirmation_code': '0'},
+            REMOTE_ADDR='10.0.0.101',
+        )
+        assert response.status_code != 429
+
+    @pytest.mark.parametrize('url', (SIGNUP_URL, TOKEN_URL))
+    @pytest.mark.parametrize('body', ('[]', '"text"', '1'))
+    def test_04_non_object_body(self, client, url, body):
+        response = client.post(url, data=body, content_type='application/json')
+        assert response.status_code == 400, (
+            f'Проверьте, что POST-запрос к `{url}` с телом `{body}` '
+            'получает ответ со статусом 400.'
+        )
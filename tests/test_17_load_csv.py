@@ -0,0 +1,126 @@
+import csv
+import os
+import shutil
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Comment, Genre, Review, Title, User
+from reviews.ratings import find_rating_mismatches
+from tests.utils import DATA_DIR, count_rows
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17LoadCsv:
+
+    def test_01_loads_all_files(self):
+        out = StringIO()
+        call_command('load_csv', batch_size=7, stdout=out)
+        assert 'Все данные загружены' in out.getvalue()
+        assert Review.objects.count() == count_rows('review.csv')
+        assert Comment.objects.count() == count_rows('comments.csv')
+        assert Title.genre.through.objects.count() == count_rows(
+            'genre_title.csv'
+        ), 'Проверьте, что загружается и файл `genre_title.csv`.'
+        assert User.objects.count() == count_rows('users.csv')
+        assert Genre.objects.count() == count_rows('genre.csv')
+
+    def test_02_keeps_relations_and_dates(self):
+        call_command('load_csv', stdout=StringIO())
+        review = Review.objects.select_related('author').get(pk=1)
+        assert review.author.username == 'bingobongo', (
+            'Проверьте, что столбец `author` связывается с пользователем.'
+        )
+        assert review.pub_date.year == 2019, (
+            'Проверьте, что дата публикации берётся из файла.'
+        )
+        assert Title.objects.get(pk=1).category.slug == 'movie'
+        assert not find_rating_mismatches().exists(), (
+            'Проверьте, что после загрузки рейтинги произведений '
+            'пересчитаны.'
+        )
+        title = Title.objects.create(name='Новое', year=2000, category_id=1)
+        assert title.pk > count_rows('titles.csv')
+
+    def copy_data(self, tmp_path):
+        for name in os.listdir(DATA_DIR):
+            shutil.copy(os.path.join(DATA_DIR, name), tmp_path / name)
+        return tmp_path
+
+    def rewrite(self, path, change):
+        with open(path, encoding='utf-8', newline='') as csv_file:
+            rows = list(csv.reader(csv_file))
+        rows = change(rows)
+        with open(path, 'w', encoding='utf-8', newline='') as csv_file:
+            csv.writer(csv_file).writerows(rows)
+
+    def test_03_upsert_skips_unchanged_rows(self, tmp_path):
+        data = self.copy_data(tmp_path)
+        call_command('load_csv', path=data, stdout=StringIO())
+        out = StringIO()
+        call_command('load_csv', path=data, upsert=True, stdout=out)
+        assert (
+            f'review.csv: добавлено 0, обновлено 0, без изменений '
+            f'{count_rows("review.csv")}'
+        ) in out.getvalue(), (
+            'Проверьте, что повторная загрузка того же файла с `--upsert` '
+            'не меняет строки и не падает на уникальных ограничениях.'
+        )
+        assert Review.objects.count() == count_rows('review.csv')
+
+    def test_04_upsert_applies_changes(self, tmp_path):
+        data = self.copy_data(tmp_path)
+        call_command('load_csv', path=data, stdout=StringIO())
+
+        def change_reviews(rows):
+            header = rows[0]
+            for row in rows[1:]:
+                if row[header.index('id')] == '1':
+                    row[header.index('score')] = '1'
+            return rows
+
+        def add_category(rows):
+            return rows + [['1000', 'Игры', 'games']]
+
+        def move_title(rows):
+            header = rows[0]
+            for row in rows[1:]:
+                if row[header.index('id')] == '2':
+                    row[header.index('category')] = '1000'
+            return rows
+
+        self.rewrite(data / 'review.csv', change_reviews)
+        self.rewrite(data / 'category.csv', add_category)
+        self.rewrite(data / 'titles.csv', move_title)
+        out = StringIO()
+        call_command('load_csv', path=data, upsert=True, stdout=out)
+        output = out.getvalue()
+        assert 'review.csv: добавлено 0, обновлено 1,' in output
+        assert 'category.csv: добавлено 1, обновлено 0,' in output
+        assert 'Пересчитан рейтинг 1 произведений' in output, (
+            'Проверьте, что рейтинг пересчитывается только у произведений '
+            'с изменёнными отзывами.'
+        )
+        assert Review.objects.get(pk=1).score == 1
+        assert Title.objects.get(pk=2).category.slug == 'games', (
+            'Проверьте, что ссылки на категорию из файла ведут на '
+            'категорию, найденную по слагу.'
+        )
+        assert not find_rating_mismatches().exists()
+
+    def test_05_upsert_restores_rows_changed_in_db(self, tmp_path):
+        data = self.copy_data(tmp_path)
+        call_command('load_csv', path=data, upsert=True, stdout=StringIO())
+        Review.objects.filter(pk=1).update(score=1)
+        Comment.objects.filter(pk=1).delete()
+        out = StringIO()
+        call_command('load_csv', path=data, upsert=True, stdout=out)
+        output = out.getvalue()
+        assert 'review.csv: добавлено 0, обновлено 1,' in output
+        assert 'comments.csv: добавлено 1, обновлено 0,' in output, (
+            'Проверьте, что `--upsert` сравнивает строки файла с записями '
+            'в БД и восстанавливает изменённые и удалённые записи.'
+        )
+        assert Comment.objects.count() == count_rows('comments.csv')
+        assert not find_rating_mismatches().exists()
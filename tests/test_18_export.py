@@ -0,0 +1,71 @@
+import json
+import os
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from tests.utils import DATA_DIR, count_rows
+
+
+def read_dir(path):
+    return {
+        name: (path / name).read_text(encoding='utf-8')
+        for name in sorted(os.listdir(path))
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18Export:
+
+    def test_01_csv_round_trip(self, tmp_path):
+        call_command('load_csv', stdout=StringIO())
+        first, second = tmp_path / 'first', tmp_path / 'second'
+        call_command('export_data', first, chunk_size=7, stdout=StringIO())
+        assert sorted(os.listdir(first)) == sorted(os.listdir(DATA_DIR)), (
+            'Проверьте, что выгружаются все файлы из `static/data`.'
+        )
+        assert (first / 'review.csv').read_text(
+            encoding='utf-8'
+        ).startswith('id,title_id,text,author,score,pub_date\n')
+
+        for model in (Comment, Review, Title, Genre, Category, User):
+            model.objects.all().delete()
+        call_command('load_csv', path=first, stdout=StringIO())
+        call_command('export_data', second, stdout=StringIO())
+        assert read_dir(first) == read_dir(second), (
+            'Проверьте, что выгрузка загружается командой `load_csv` '
+            'без потерь.'
+        )
+
+    def test_02_ndjson(self, tmp_path):
+        call_command('load_csv', stdout=StringIO())
+        call_command('export_data', tmp_path, format='ndjson',
+                     stdout=StringIO())
+        with open(tmp_path / 'review.ndjson', encoding='utf-8') as file:
+            reviews = [json.loads(line) for line in file]
+        assert len(reviews) == count_rows('review.csv')
+        assert reviews[0]['author'] == 100
+        assert reviews[0]['pub_date'].startswith('2019-09-24T21:08:21')
+
+    def test_03_endpoint(self, client, user_client, admin_client):
+        call_command('load_csv', stdout=StringIO())
+        url = '/api/v1/export/review.csv'
+        assert client.get(url).status_code == 401
+        assert user_client.get(url).status_code == 403, (
+            'Проверьте, что выгрузка доступна только администратору.'
+        )
+        response = admin_client.get(url)
+        assert response.status_code == 200
+        assert response.streaming, (
+            'Проверьте, что выгрузка отдаётся потоком.'
+        )
+        content = b''.join(response.streaming_content).decode()
+        assert content.startswith('id,title_id,text')
+        response = admin_client.get('/api/v1/export/titles.ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        assert len(lines) == count_rows('titles.csv')
+        assert admin_client.get(
+            '/api/v1/export/unknown.csv'
+        ).status_code == 404
@@ -0,0 +1,65 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count
+
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.ratings import find_rating_mismatches
+from reviews.synthetic import zipf_counts
+
+OPTIONS = {
+    'users': 50, 'categories': 3, 'genres': 5, 'titles': 40,
+    'reviews': 400, 'comments': 300, 'batch_size': 64,
+}
+
+
+def snapshot():
+    return list(
+        Review.objects.order_by('pk').values_list(
+            'title_id', 'author_id', 'score', 'text', 'pub_date'
+        )
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19GenerateData:
+
+    def test_01_zipf_counts(self):
+        counts = zipf_counts(1000, 100, 1.1, 50)
+        assert sum(counts) == 1000
+        assert max(counts) == 50, (
+            'Проверьте, что корзина не превышает ограничение cap.'
+        )
+        assert counts[0] >= counts[10] >= counts[-1]
+
+    def test_02_volumes_and_skew(self):
+        call_command('generate_data', seed=1, stdout=StringIO(), **OPTIONS)
+        assert User.objects.count() == 50
+        assert Title.objects.count() == 40
+        assert Genre.objects.count() == 5
+        assert Review.objects.count() == 400
+        assert Comment.objects.count() == 300
+        per_title = sorted(
+            Title.objects.annotate(count=Count('reviews'))
+            .values_list('count', flat=True)
+        )
+        assert per_title[-1] > 4 * per_title[len(per_title) // 2], (
+            'Проверьте, что отзывы распределены по произведениям '
+            'неравномерно, по закону Ципфа.'
+        )
+        assert Title.genre.through.objects.count() > Title.objects.count()
+        assert not find_rating_mismatches().exists()
+        assert any(
+            'а' <= letter <= 'я' for letter in Review.objects.first().text
+        ), 'Проверьте, что тексты генерируются на кириллице.'
+
+    def test_03_seed_is_reproducible(self):
+        call_command('generate_data', seed=7, stdout=StringIO(), **OPTIONS)
+        first = snapshot()
+        for model in (Comment, Review, Title, Genre, Category, User):
+            model.objects.all().delete()
+        call_command('generate_data', seed=7, stdout=StringIO(), **OPTIONS)
+        assert [row[2:] for row in snapshot()] == [
+            row[2:] for row in first
+        ], 'Проверьте, что одно и то же зерно даёт одинаковые данные.'
@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+from api.benchmark import Benchmark, compare, load_baseline
+from reviews.synthetic import DatasetGenerator
+
+from .conftest import MANAGE_PATH
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20Benchmark:
+
+    def test_01_all_scenarios_run(self):
+        DatasetGenerator(seed=1).generate(20, 2, 3, 10, 60, 60)
+        results = Benchmark(iterations=2, warmup=1).run()
+        baseline = load_baseline(
+            os.path.join(MANAGE_PATH, 'benchmark_baseline.json')
+        )
+        assert set(results) == set(baseline), (
+            'Проверьте, что базовые результаты есть для всех сценариев.'
+        )
+        for name, metrics in results.items():
+            assert metrics['queries'] > 0, name
+            assert 0 < metrics['p50_ms'] <= metrics['p99_ms'], name
+            assert metrics['memory_kb'] > 0, name
+
+    def test_02_compare(self):
+        baseline = {
+            'titles-list': {
+                'p50_ms': 2.0, 'p99_ms': 3.0, 'queries': 3, 'memory_kb': 100,
+            },
+        }
+        same = {'titles-list': dict(baseline['titles-list'], p99_ms=4.5)}
+        assert compare(same, baseline) == [], (
+            'Проверьте, что шум во времени ответа меньше порога не '
+            'считается регрессией.'
+        )
+        worse = {
+            'titles-list': dict(
+                baseline['titles-list'], queries=4, p50_ms=9.0
+            ),
+        }
+        assert compare(worse, baseline) == [
+            'titles-list: p50_ms 2.0 -> 9.0',
+            'titles-list: queries 3 -> 4',
+        ]
+        assert compare(worse, baseline, queries_threshold=1) == [
+            'titles-list: p50_ms 2.0 -> 9.0',
+        ]
@@ -0,0 +1,50 @@
+import logging
+
+import pytest
+
+from api.middleware import QueryBudgetExceeded, fingerprint
+from api.views import TitleViewSet
+from reviews.models import Title
+from tests.utils import create_catalog
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21QueryInspector:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_fingerprint(self):
+        assert fingerprint(
+            'SELECT * FROM "t" WHERE "id" IN (%s, %s, %s)'
+        ) == fingerprint('SELECT * FROM "t" WHERE "id" IN (%s, %s)'), (
+            'Проверьте, что списки IN разной длины дают одну форму '
+            'запроса.'
+        )
+
+    def test_02_report_on_request(self, client):
+        create_catalog(3)
+        response = client.get(self.TITLES_URL)
+        report = response.wsgi_request.query_report
+        assert report.view_name == 'api:titles-list'
+        assert report.count == 3 and report.duration > 0
+        assert report.budget == TitleViewSet.query_budget['list']
+
+    def test_03_n_plus_one_raises_in_tests(self, client, monkeypatch):
+        create_catalog(10)
+        monkeypatch.setattr(TitleViewSet, 'queryset', Title.objects.all())
+        with pytest.raises(QueryBudgetExceeded, match='api:titles-list'):
+            client.get(self.TITLES_URL)
+
+    def test_04_n_plus_one_logged_in_production(
+        self, client, monkeypatch, settings, caplog
+    ):
+        settings.QUERY_INSPECTOR_RAISE = False
+        create_catalog(10)
+        monkeypatch.setattr(TitleViewSet, 'queryset', Title.objects.all())
+        with caplog.at_level(logging.WARNING, logger='api.middleware'):
+            response = client.get(self.TITLES_URL)
+        assert response.status_code == 200
+        assert 'api:titles-list' in caplog.text and 'N+1' in caplog.text, (
+            'Проверьте, что вне тестов N+1 записывается в лог с именем '
+            'представления.'
+        )
@@ -0,0 +1,143 @@
+import re
+
+import pytest
+
+from api import metrics
+from api.metrics import MetricsFile, collect, render_metrics
+from tests.utils import create_catalog
+
+METRICS_TOKEN = 'test-token'
+
+
+def sample(text, name, **labels):
+    """Значение метрики name с метками labels из вывода /metrics."""
+
+    label_text = ','.join(
+        f'{key}="{value}"' for key, value in labels.items()
+    )
+    match = re.search(
+        rf'^{name}\{{{re.escape(label_text)}\}} (\S+)$', text, re.MULTILINE
+    )
+    assert match, f'Метрика {name}{{{label_text}}} не найдена.'
+    return float(match.group(1))
+
+
+def get_metrics(client):
+    return client.get(
+        '/metrics', HTTP_AUTHORIZATION=f'Bearer {METRICS_TOKEN}'
+    )
+
+
+@pytest.fixture(autouse=True)
+def metrics_token(settings):
+    settings.METRICS_TOKEN = METRICS_TOKEN
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22Metrics:
+
+    def test_01_requests_counted_by_route(self, client, settings):
+        settings.RESPONSE_CACHE_ENABLED = False
+        create_catalog(3)
+        for _ in range(2):
+            assert client.get('/api/v1/titles/').status_code == 200
+        client.get('/api/v1/titles/?limit=')
+        response = get_metrics(client)
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        text = response.content.decode()
+        route = {'route': 'api:titles-list', 'method': 'GET'}
+        assert sample(text, 'yamdb_http_requests_total', **route) == 3, (
+            'Проверьте, что запросы считаются по имени маршрута, а не по '
+            'URL с параметрами.'
+        )
+        assert sample(text, 'yamdb_db_queries_total', **route) == 9, (
+            'Проверьте, что число SQL-запросов берётся из '
+            'QueryInspectorMiddleware.'
+        )
+        assert sample(text, 'yamdb_serialization_seconds_total', **route) > 0
+        assert sample(text, 'yamdb_response_bytes_total', **route) > 0
+
+    def test_02_histogram_is_cumulative(self, client):
+        client.get('/api/v1/categories/')
+        text = get_metrics(client).content.decode()
+        route = {'route': 'api:сategories-list', 'method': 'GET'}
+        buckets = [
+            float(value) for value in re.findall(
+                r'^yamdb_http_request_duration_seconds_bucket'
+                r'\{route="api:сategories-list",method="GET",le="[^"]+"\} '
+                r'(\S+)$', text, re.MULTILINE,
+            )
+        ]
+        assert buckets == sorted(buckets) and buckets[-1] == 1, (
+            'Проверьте, что корзины гистограммы накопительные, а +Inf '
+            'равна числу запросов.'
+        )
+        assert sample(
+            text, 'yamdb_http_request_duration_seconds_count', **route
+        ) == 1
+
+    def test_03_processes_are_summed(self, settings, monkeypatch):
+        for pid in (101, 102):
+            monkeypatch.setattr(metrics.os, 'getpid', lambda: pid)
+            MetricsFile(settings.METRICS_DIR).add(
+                'api:titles-list\x00GET',
+                {metrics.REQUESTS: 2, metrics.DB_QUERIES: 6},
+            )
+        totals = collect(settings.METRICS_DIR)
+        vector = totals['api:titles-list\x00GET']
+        assert vector[metrics.REQUESTS] == 4, (
+            'Проверьте, что /metrics суммирует файлы всех процессов.'
+        )
+        assert vector[metrics.DB_QUERIES] == 12
+        assert 'yamdb_http_requests_total' in render_metrics(
+            settings.METRICS_DIR
+        )
+
+    def test_04_file_grows_and_reopens(self, settings):
+        directory = settings.METRICS_DIR
+        metrics_file = MetricsFile(directory)
+        routes = [f'route-{number:04}' * 20 for number in range(400)]
+        for route in routes:
+            metrics_file.add(route, {metrics.REQUESTS: 1})
+        metrics_file.add(routes[0], {metrics.REQUESTS: 1})
+        reopened = MetricsFile(directory)
+        assert len(reopened.vectors) == len(routes), (
+            'Проверьте, что файл метрик растёт, когда место кончается, и '
+            'записи читаются при повторном открытии.'
+        )
+        assert reopened.vectors[routes[0]][metrics.REQUESTS] == 2
+
+    def test_05_access_restricted(self, client, settings):
+        assert client.get('/metrics').status_code == 403, (
+            'Проверьте, что без токена `/metrics` недоступен даже с '
+            'локального адреса, с которого приходят запросы через прокси.'
+        )
+        assert client.get(
+            '/metrics', HTTP_AUTHORIZATION='Bearer wrong'
+        ).status_code == 403
+        assert get_metrics(client).status_code == 200, (
+            'Проверьте, что `/metrics` доступен по токену METRICS_TOKEN.'
+        )
+        settings.METRICS_TOKEN = None
+        settings.METRICS_ALLOWED_IPS = ('203.0.113.7',)
+        assert client.get(
+            '/metrics', REMOTE_ADDR='203.0.113.7'
+        ).status_code == 200, (
+            'Проверьте, что `/metrics` доступен адресам из '
+            'METRICS_ALLOWED_IPS.'
+        )
+        assert client.get(
+            '/metrics', HTTP_AUTHORIZATION='Bearer None'
+        ).status_code == 403
+
+    def test_06_unknown_methods_grouped(self, client):
+        for method in ('PROPFIND', 'FOO'):
+            client.generic(method, '/api/v1/categories/')
+        text = get_metrics(client).content.decode()
+        route = {'route': 'api:сategories-list', 'method': 'other'}
+        assert sample(text, 'yamdb_http_requests_total', **route) == 2, (
+            'Проверьте, что нестандартные методы HTTP учитываются с '
+            'меткой method="other".'
+        )
+        assert 'method="FOO"' not in text
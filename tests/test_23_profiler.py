@@ -0,0 +1,72 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from api.profiling import merge_stacks
+from tests.utils import create_catalog
+
+TITLES_FILE = 'api_titles-list.folded'
+
+
+def read_stacks(path):
+    return dict(
+        line.rsplit(' ', 1) for line in path.read_text().splitlines()
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23Profiler:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_disabled_by_default(self, client, settings):
+        settings.PROFILER_SAMPLE_RATE = 1.0
+        client.get(self.TITLES_URL, HTTP_X_PROFILE='1')
+        assert not settings.PROFILER_DIR.exists(), (
+            'Проверьте, что без PROFILER_ENABLED запросы не профилируются.'
+        )
+
+    def test_02_sampled_request_writes_stacks(self, client, settings):
+        settings.PROFILER_ENABLED = True
+        settings.PROFILER_SAMPLE_RATE = 1.0
+        create_catalog(3)
+        assert client.get(self.TITLES_URL).status_code == 200
+        stacks = read_stacks(settings.PROFILER_DIR / TITLES_FILE)
+        assert any(
+            'rest_framework.views:dispatch' in stack for stack in stacks
+        ), (
+            'Проверьте, что стеки записываются в файл представления и '
+            'содержат функции представления.'
+        )
+        assert all(weight.isdigit() for weight in stacks.values())
+        assert not any(
+            stack.startswith('api.middleware:__call__') for stack in stacks
+        ), 'Проверьте, что стеки начинаются ниже профилировщика.'
+
+    def test_03_header_only_for_admin(
+        self, settings, user_client, admin_client
+    ):
+        settings.PROFILER_ENABLED = True
+        user_client.get(self.TITLES_URL, HTTP_X_PROFILE='1')
+        assert not (settings.PROFILER_DIR / TITLES_FILE).exists(), (
+            'Проверьте, что заголовок X-Profile работает только для '
+            'администратора.'
+        )
+        admin_client.get(self.TITLES_URL, HTTP_X_PROFILE='1')
+        assert (settings.PROFILER_DIR / TITLES_FILE).exists(), (
+            'Проверьте, что запрос администратора с заголовком X-Profile '
+            'профилируется.'
+        )
+
+    def test_04_merge_profiles(self, tmp_path):
+        (tmp_path / 'a.folded').write_text('a;b 10\na;c 5\n')
+        (tmp_path / 'b.folded').write_text('a;b 7\n')
+        assert merge_stacks(
+            [tmp_path / 'a.folded', tmp_path / 'b.folded']
+        ) == {'a;b': 17, 'a;c': 5}
+        out = StringIO()
+        call_command('merge_profiles', '--path', tmp_path, stdout=out)
+        assert out.getvalue() == 'a;b 17\na;c 5\n', (
+            'Проверьте, что merge_profiles складывает одинаковые стеки.'
+        )
@@ -0,0 +1,159 @@
+from io import StringIO
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+
+from api import caching
+from api.caching import DjangoCacheStore, SQLiteResponseStore
+from reviews.models import Category, Genre, Review, Title
+from tests.utils import create_catalog
+
+
+def get(client, url, **extra):
+    response = client.get(url, **extra)
+    assert response.status_code == 200, (
+        f'GET-запрос к `{url}` должен возвращать ответ со статусом 200.'
+    )
+    return response
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24ResponseCache:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_repeated_request_served_from_cache(self, client):
+        create_catalog(3)
+        first = get(client, f'{self.TITLES_URL}?year=2000&limit=5')
+        second = get(client, f'{self.TITLES_URL}?limit=5&year=2000')
+        assert first['X-Cache'] == 'MISS'
+        assert second['X-Cache'] == 'HIT', (
+            'Проверьте, что порядок параметров запроса не влияет на ключ '
+            'кеша.'
+        )
+        assert second.wsgi_request.query_report.count == 0
+        assert second.json() == first.json()
+        assert get(client, f'{self.TITLES_URL}?limit=6')['X-Cache'] == 'MISS'
+
+    def test_02_title_changes_invalidate(self, client):
+        titles = create_catalog(3)
+        detail_url = f'{self.TITLES_URL}{titles[0].id}/'
+        get(client, self.TITLES_URL)
+        get(client, detail_url)
+
+        category = Category.objects.get(slug='category-0')
+        category.name = 'Переименована'
+        category.save()
+        response = get(client, self.TITLES_URL)
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что изменение категории сбрасывает кеш '
+            'произведений.'
+        )
+
+        titles[0].genre.add(Genre.objects.get(slug='genre-2'))
+        response = get(client, detail_url)
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что изменение жанров произведения сбрасывает кеш.'
+        )
+        assert 'genre-2' in [genre['slug'] for genre in response.json()[
+            'genre'
+        ]]
+
+    def test_03_reviews_invalidated_per_title(self, client, user):
+        titles = create_catalog(2)
+        first_url = f'{self.TITLES_URL}{titles[0].id}/'
+        second_reviews = f'{self.TITLES_URL}{titles[1].id}/reviews/'
+        get(client, first_url)
+        get(client, second_reviews)
+        Review.objects.create(
+            title=titles[0], author=user, text='Отзыв', score=8
+        )
+        response = get(client, first_url)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['rating'] == 8, (
+            'Проверьте, что новый отзыв сбрасывает кеш рейтинга '
+            'произведения.'
+        )
+        assert get(client, second_reviews)['X-Cache'] == 'HIT', (
+            'Проверьте, что отзыв на одно произведение не сбрасывает кеш '
+            'отзывов на другие.'
+        )
+
+    def test_04_cache_depends_on_audience(self, client, user_client):
+        create_catalog(1)
+        get(client, self.TITLES_URL)
+        # Пользователь попадает в кеш аутентификации.
+        get(user_client, '/api/v1/users/me/')
+        assert get(user_client, self.TITLES_URL)['X-Cache'] == 'MISS', (
+            'Проверьте, что анонимные и авторизованные пользователи '
+            'получают разные записи кеша.'
+        )
+        response = client.get(
+            self.TITLES_URL, HTTP_AUTHORIZATION='Bearer invalid'
+        )
+        assert response.status_code == 401, (
+            'Проверьте, что аутентификация проверяется до обращения к '
+            'кешу.'
+        )
+
+    def test_05_sqlite_store(self, client):
+        store = SQLiteResponseStore()
+        assert store.add('key', 1, None) and not store.add('key', 2, None)
+        assert store.add('expired', 1, -1) and store.add('expired', 2, 10)
+        assert store.get_many(['key', 'expired', 'missing']) == {
+            'key': 1, 'expired': 2
+        }
+        create_catalog(1)
+        get(client, '/api/v1/genres/')
+        assert get(client, '/api/v1/genres/')['X-Cache'] == 'HIT'
+        Title.objects.create(
+            name='Новое', year=2000, category=Category.objects.first()
+        )
+        assert get(client, '/api/v1/genres/')['X-Cache'] == 'HIT', (
+            'Проверьте, что произведения не сбрасывают кеш жанров.'
+        )
+        Genre.objects.create(name='Новый', slug='new')
+        assert get(client, '/api/v1/genres/')['X-Cache'] == 'MISS'
+
+    def test_06_cache_disabled(self, client, settings):
+        settings.RESPONSE_CACHE_ENABLED = False
+        create_catalog(1)
+        get(client, self.TITLES_URL)
+        response = get(client, self.TITLES_URL)
+        assert 'X-Cache' not in response, (
+            'Проверьте, что при RESPONSE_CACHE_ENABLED = False ответы не '
+            'кешируются.'
+        )
+        assert response.wsgi_request.query_report.count > 0
+
+    def test_07_process_local_cache_refused(self):
+        with pytest.raises(ImproperlyConfigured):
+            DjangoCacheStore()
+
+    def test_08_expired_entries_purged(self, monkeypatch):
+        store = SQLiteResponseStore()
+        for number in range(5):
+            store.set(f'old-{number}', number, -1)
+        monkeypatch.setattr(caching.random, 'random', lambda: 0.0)
+        store.set('live', 1, 60)
+        rows = store.get_connection().execute(
+            'SELECT key FROM entry'
+        ).fetchall()
+        assert rows == [('live',)], (
+            'Проверьте, что SQLiteResponseStore удаляет истёкшие записи.'
+        )
+
+    def test_09_commands_invalidate(self, client):
+        get(client, '/api/v1/genres/')
+        call_command('load_csv', stdout=StringIO())
+        assert get(client, '/api/v1/genres/')['X-Cache'] == 'MISS', (
+            'Проверьте, что `load_csv` сбрасывает кеш ответов.'
+        )
+        get(client, self.TITLES_URL)
+        Title.objects.update(rating_sum=100, rating_count=1)
+        call_command('recalculate_ratings', stdout=StringIO())
+        assert get(client, self.TITLES_URL)['X-Cache'] == 'MISS', (
+            'Проверьте, что `recalculate_ratings` сбрасывает кеш '
+            'произведений.'
+        )
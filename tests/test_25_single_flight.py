@@ -0,0 +1,125 @@
+import threading
+import time
+
+import pytest
+
+from api import caching
+from api.benchmark import Stampede
+from api.caching import (
+    LocalLock,
+    StoreLock,
+    get_lock,
+    get_or_compute,
+    get_response_store,
+    is_fresh,
+)
+from tests.utils import create_catalog
+
+
+class Compute:
+    """compute() для get_or_compute, который считает свои вызовы."""
+
+    def __init__(self, value='новое'):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25SingleFlight:
+
+    @pytest.mark.parametrize('lock_class', [LocalLock, StoreLock])
+    def test_01_lock(self, lock_class):
+        lock = lock_class()
+        token = lock.acquire('key', 10)
+        assert token and lock.locked('key')
+        assert not lock.acquire('key', 10), (
+            'Проверьте, что занятую блокировку нельзя захватить повторно.'
+        )
+        lock.release('key', token)
+        assert not lock.locked('key')
+        lock.release('key', lock.acquire('key', 10))
+
+    @pytest.mark.parametrize('lock_class', [LocalLock, StoreLock])
+    def test_02_lock_expires(self, lock_class):
+        lock = lock_class()
+        expired = lock.acquire('expiring', 0.01)
+        time.sleep(0.02)
+        token = lock.acquire('expiring', 10)
+        assert token, (
+            'Проверьте, что блокировка снимается по истечении timeout.'
+        )
+        lock.release('expiring', expired)
+        assert lock.locked('expiring'), (
+            'Проверьте, что прежний владелец не снимает блокировку, '
+            'которую после истечения захватил другой запрос.'
+        )
+        lock.release('expiring', token)
+        assert not lock.locked('expiring')
+
+    def test_03_early_refresh(self, monkeypatch):
+        now = 1000.0
+        assert is_fresh(('data', now + 60, 0.5), now)
+        assert not is_fresh(('data', now - 1, 0.5), now)
+        monkeypatch.setattr(caching.random, 'random', lambda: 0.99)
+        assert not is_fresh(('data', now + 1, 0.5), now), (
+            'Проверьте, что запись с долгим пересчётом близко к сроку '
+            'может быть обновлена досрочно.'
+        )
+
+    def test_04_stale_value_while_refreshing(self):
+        store = get_response_store()
+        store.set('key', ('старое', time.time() - 1, 0.1), 60)
+        lock = get_lock()
+        token = lock.acquire('key', 10)
+        compute = Compute()
+        try:
+            assert get_or_compute(store, 'key', compute) == (
+                'старое', 'STALE'
+            ), (
+                'Проверьте, что пока ключ пересчитывает другой запрос, '
+                'отдаётся устаревшее значение.'
+            )
+        finally:
+            lock.release('key', token)
+        assert compute.calls == 0
+        assert get_or_compute(store, 'key', compute) == ('новое', 'MISS')
+        assert get_or_compute(store, 'key', compute) == ('новое', 'HIT')
+        assert compute.calls == 1
+
+    def test_05_waits_for_refresh(self):
+        store = get_response_store()
+        lock = get_lock()
+        token = lock.acquire('key', 10)
+
+        def finish():
+            time.sleep(0.05)
+            store.set('key', ('готово', time.time() + 60, 0.05), 60)
+            lock.release('key', token)
+
+        thread = threading.Thread(target=finish)
+        thread.start()
+        compute = Compute()
+        assert get_or_compute(store, 'key', compute) == ('готово', 'HIT')
+        thread.join()
+        assert compute.calls == 0, (
+            'Проверьте, что без устаревшего значения запрос ждёт пересчёта, '
+            'а не считает значение сам.'
+        )
+
+    def test_06_mass_expiry_recomputed_once(self):
+        create_catalog(3)
+        results = Stampede(
+            '/api/v1/titles/', 'titles', workers=8, rounds=2
+        ).run()
+        assert results['single-flight']['recomputed'] == 1, (
+            'Проверьте, что после сброса кеша ответ пересчитывает один '
+            'запрос.'
+        )
+        assert (
+            results['single-flight']['queries']
+            <= results['без защиты']['queries']
+        )
@@ -1,5 +1,12 @@
+import csv
+import os
 from http import HTTPStatus
 
+from reviews.models import Category, Genre, Review, Title, User
+from tests.conftest import MANAGE_PATH
+
+DATA_DIR = os.path.join(MANAGE_PATH, 'static', 'data')
+
 check_name_and_slug_patterns = (
     (
         {
@@ -304,3 +311,45 @@ def check_fields(obj_type, url_pattern, obj, expected_data, detail=False):
         f'данные {obj_types[obj_type]}{results_in_msg}. Поле `id` не '
         'найдено или не является целым числом.'
     )
+
+
+def create_title_with_reviews(reviews_amount):
+    category = Category.objects.create(name='Фильм', slug='films')
+    title = Title.objects.create(name='Терминатор', year=1984,
+                                 category=category)
+    for idx in range(reviews_amount):
+        author = User.objects.create_user(
+            username=f'reviewer{idx}', email=f'reviewer{idx}@yamdb.fake'
+        )
+        Review.objects.create(
+            title=title, author=author, text=f'review {idx}', score=5
+        )
+    return title
+
+
+def create_catalog(amount):
+    genres = [
+        Genre.objects.create(name=f'Жанр {idx}', slug=f'genre-{idx}')
+        for idx in range(3)
+    ]
+    categories = [
+        Category.objects.create(
+            name=f'Категория {idx}', slug=f'category-{idx}'
+        )
+        for idx in range(3)
+    ]
+    titles = []
+    for idx in range(amount):
+        title = Title.objects.create(
+            name=f'Произведение {idx}',
+            year=2000,
+            category=categories[idx % len(categories)],
+        )
+        title.genre.set(genres[:idx % len(genres) + 1])
+        titles.append(title)
+    return titles
+
+
+def count_rows(name):
+    with open(os.path.join(DATA_DIR, name), encoding='utf-8') as csv_file:
+        return sum(1 for _ in csv.reader(csv_file)) - 1